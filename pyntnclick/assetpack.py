@@ -0,0 +1,147 @@
+# -*- test-case-name: pyntnclick.tests.test_assetpack -*-
+"""Packing a resource module's files into a single file.
+
+A pack is a header, a JSON index mapping each file's name (relative to
+the resource module, with '/' separators) to its offset and size, and then
+the files' contents. Opening a pack only reads the index, and the contents
+are read from a memory map of the file, so loading resources from a pack
+needs one open file rather than one per resource.
+"""
+
+import io
+import json
+import mmap
+import os
+import struct
+
+from .utils import atomic_write
+
+# The name of a resource module's pack, in the resource module
+PACK_NAME = 'resources.pack'
+
+MAGIC = b'PNCPACK1'
+# magic, index length
+HEADER = struct.Struct('<8sI')
+
+
+class AssetPackError(Exception):
+    pass
+
+
+class PackFile(io.RawIOBase):
+    """A read-only file object for a file in a pack.
+
+    Reads copy straight from the memory map into the reader's buffer."""
+
+    def __init__(self, view, name):
+        super(PackFile, self).__init__()
+        self._view = view
+        self._pos = 0
+        self.name = name
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, b):
+        data = self._view[self._pos:self._pos + len(b)]
+        n = len(data)
+        b[:n] = data
+        self._pos += n
+        return n
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        if offset < 0:
+            raise ValueError('negative seek position %d' % (offset,))
+        self._pos = offset
+        return self._pos
+
+    def tell(self):
+        return self._pos
+
+
+class AssetPack(object):
+    """A pack of resource files, memory mapped."""
+
+    def __init__(self, filename):
+        self.filename = filename
+        with open(filename, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, index_size = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            self._mmap.close()
+            raise AssetPackError('%s is not an asset pack' % (filename,))
+        start = HEADER.size + index_size
+        index = json.loads(
+            self._mmap[HEADER.size:start].decode('utf-8'))
+        # map of name -> (offset, size)
+        self._index = dict((name, (start + offset, size))
+                           for name, (offset, size) in index.items())
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def names(self):
+        return list(self._index)
+
+    def get_buffer(self, name):
+        """Return a memoryview of a file's contents, without copying."""
+        offset, size = self._index[name]
+        return memoryview(self._mmap)[offset:offset + size]
+
+    def open(self, name):
+        """Return a file object for a file in the pack."""
+        return PackFile(self.get_buffer(name), name)
+
+
+def list_files(root, exclude=()):
+    """List the files in a resource module to pack, as names relative to
+    it.
+
+    Python files and the top level directories in exclude are left out.
+    """
+    names = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        rel = os.path.relpath(dirpath, root)
+        parts = [] if rel == os.curdir else rel.split(os.sep)
+        if not parts:
+            dirnames[:] = [name for name in dirnames if name not in exclude]
+        dirnames[:] = sorted(name for name in dirnames
+                             if name != '__pycache__')
+        for filename in sorted(filenames):
+            if (filename == PACK_NAME
+                    or os.path.splitext(filename)[1] in (
+                        '.py', '.pyc', '.pyo')):
+                continue
+            names.append('/'.join(parts + [filename]))
+    return names
+
+
+def build_pack(root, filename, exclude=()):
+    """Pack the files in the directory root into filename.
+
+    Returns the names of the files packed."""
+    names = list_files(root, exclude)
+    index = {}
+    offset = 0
+    for name in names:
+        size = os.path.getsize(os.path.join(root, *name.split('/')))
+        index[name] = (offset, size)
+        offset += size
+    index_data = json.dumps(index, sort_keys=True).encode('utf-8')
+    with atomic_write(filename) as f:
+        f.write(HEADER.pack(MAGIC, len(index_data)))
+        f.write(index_data)
+        for name in names:
+            with open(os.path.join(root, *name.split('/')), 'rb') as src:
+                data = src.read()
+            if len(data) != index[name][1]:
+                raise AssetPackError('%s changed while packing' % (name,))
+            f.write(data)
+    return names
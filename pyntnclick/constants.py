@@ -28,6 +28,34 @@ class GameConstants(object):
     button_size = 50
     scene_size = (screen[0], screen[1] - button_size)
     frame_rate = 25
+    # Animation delays are counted in frames at this rate, whatever the
+    # actual frame rate is
+    animation_frame_rate = 25
+    # Only update the parts of the display that changed each frame
+    dirty_rects = False
+    # If set, wait up to this many milliseconds for an event instead of
+    # drawing frames when nothing is animating
+    idle_timeout = None
+    # If set, save the game in the background at most this often (in
+    # seconds) while it is changing
+    autosave_interval = None
+    # Journal every change to the game state, so little is lost on a crash,
+    # saving the full state every journal_compact_ops changes
+    state_journal = False
+    journal_compact_ops = 200
+    # If set, keep at most this many bytes of images cached, other than
+    # those still in use
+    image_cache_bytes = None
+    # Number of threads decoding preloaded images
+    image_loader_threads = 2
+    # Preload the images for up to this many of the scenes the player is
+    # likely to go to next
+    prefetch_scenes = 4
+    # Index all the resource files at startup, rather than looking for
+    # each one as it's needed
+    scan_resources = False
+    # Number of frames to keep timings for
+    metrics_frames = 250
     debug = _get_debug()
 
     font = 'DejaVuSans.ttf'
@@ -43,4 +71,7 @@ class GameConstants(object):
     button_bg_color = (0x66, 0x66, 0x66, 0xFF)
     button_disabled_color = (0x66, 0x66, 0x66, 0xFF)
 
+    # Number of rendered hover descriptions to keep around
+    description_cache_size = 64
+
     modal_obscure_color = (0, 0, 0, 0xB0)
@@ -65,10 +65,25 @@ class CursorScreen(Screen):
 
     def draw(self, surface):
         super(CursorScreen, self).draw(surface)
+        self.draw_cursor(surface)
+
+    def draw_dirty(self, surface):
+        # Redraw where the cursor was and where it is now, so we neither
+        # leave a trail nor draw it twice over itself
+        for sprite in self._cursor_group:
+            self.mark_dirty(sprite.rect)
+        self.set_cursor(self.game.tool)
+        self._cursor_group.update()
+        for sprite in self._cursor_group:
+            self.mark_dirty(sprite.rect)
+        return super(CursorScreen, self).draw_dirty(surface)
+
+    def draw_cursor(self, surface):
+        """Draw the cursor, returning the rects it touched."""
         self.set_cursor(self.game.tool)
         self._loaded_cursor.set_highlight(self.cursor_highlight())
         self._cursor_group.update()
-        self._cursor_group.draw(surface)
+        return self._cursor_group.draw(surface)
 
     def set_cursor(self, item):
         if item is None or item.CURSOR is None:
@@ -1,15 +1,105 @@
 """Game engine and top-level game loop."""
 
+from collections import deque
+from timeit import default_timer
+
 import pygame
 import pygame.event
 import pygame.display
 import pygame.time
-from pygame.locals import QUIT, USEREVENT
+from pygame.locals import QUIT, USEREVENT, MOUSEMOTION, NOEVENT
+
+from .metrics import FrameMetrics, MetricsOverlay
+
+# map of UserEvent.TYPE -> pygame event type
+_EVENT_TYPES = {}
+_last_event_type = [USEREVENT]
+
+
+def allocate_event_type():
+    """Reserve a new pygame event type number."""
+    if hasattr(pygame.event, 'custom_type'):
+        return pygame.event.custom_type()
+    # Older pygames leave the bookkeeping up to us
+    _last_event_type[0] += 1
+    return _last_event_type[0]
+
+
+class EventBus(object):
+    """An in-process queue for the events the game posts itself.
+
+       UserEvents go here rather than to the SDL event queue, so game
+       logic runs without a display and without the SDL queue's size
+       limit. The engine drains the bus every frame; headless runners
+       can drain it directly."""
+
+    def __init__(self):
+        self._events = deque()
+
+    def __len__(self):
+        return len(self._events)
+
+    def post(self, ev):
+        self._events.append(ev)
+
+    def drain(self):
+        """Remove and return all the queued events."""
+        events = list(self._events)
+        self._events.clear()
+        return events
+
+    def clear(self):
+        self._events.clear()
+
+
+_event_bus = EventBus()
+
+
+def get_event_bus():
+    return _event_bus
+
+
+def set_event_bus(bus):
+    """Replace the bus UserEvents are posted to, returning the old one."""
+    global _event_bus
+    old_bus, _event_bus = _event_bus, bus
+    return old_bus
+
+
+def wait_event(timeout):
+    """Wait up to timeout milliseconds for an SDL event, returning a
+    NOEVENT event if none comes."""
+    try:
+        return pygame.event.wait(timeout)
+    except TypeError:
+        pass
+    # Older pygames can't wait with a timeout, so poll
+    end = pygame.time.get_ticks() + timeout
+    while True:
+        ev = pygame.event.poll()
+        if ev.type != NOEVENT or pygame.time.get_ticks() >= end:
+            return ev
+        pygame.time.wait(10)
+
+
+def merge_rects(rects):
+    """Merge overlapping rects, returning a list of rects that cover the
+    same area and don't overlap each other."""
+    merged = []
+    for rect in rects:
+        rect = pygame.Rect(rect)
+        i = rect.collidelist(merged)
+        while i != -1:
+            rect.union_ip(merged.pop(i))
+            i = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
+
 
 # We can't do this via our usual UserEvent trickey
 # as it gets generated by pygame.music, which only
 # takes an event type
-MUSIC_ENDED = USEREVENT + 1
+MUSIC_ENDED = allocate_event_type()
 
 
 class Engine(object):
@@ -17,6 +107,26 @@ class Engine(object):
         self._screen = None
         self._gd = gd
         self.screens = {}
+        # Only push the changed regions of the screen to the display,
+        # rather than flipping the whole thing every frame.
+        self.dirty_rects = gd.constants.dirty_rects
+        self.metrics = FrameMetrics(gd.constants.metrics_frames)
+        self._metrics_overlay = None
+        self._fps = 0.0
+        # Set when the last frame had no events and nothing animating
+        self.idle = False
+
+    @property
+    def fps(self):
+        """The frame rate measured over the last frame."""
+        return self._fps
+
+    def show_metrics(self, enable=True):
+        """Toggle the frame timing debug overlay."""
+        if enable:
+            self._metrics_overlay = MetricsOverlay(self._gd, self.metrics)
+        else:
+            self._metrics_overlay = None
 
     def set_screen(self, screen_name):
         if self._screen is not None:
@@ -31,35 +141,149 @@ class Engine(object):
     def run(self):
         """Game loop."""
 
-        get_events = pygame.event.get
-        flip = pygame.display.flip
+        get_events = self.get_events
+        idle_timeout = self._gd.constants.idle_timeout
         clock = pygame.time.Clock()
         while True:
             events = get_events()
-            for ev in events:
-                if ev.type == QUIT:
-                    return
-                elif ev.type == MUSIC_ENDED:
-                    self._gd.sound.music_ended()
-                elif ScreenChangeEvent.matches(ev):
-                    self.set_screen(ev.screen_name)
-                elif ScreenEvent.matches(ev):
-                    self.screens[ev.screen_name].process_event(ev.event_name,
-                                                               ev.data)
-                else:
-                    self._screen.dispatch(ev)
-            # Ping the screen / scene
-            self._screen.animate()
-            surface = pygame.display.get_surface()
-            self._screen.draw(surface)
-            flip()
+            if not events and self.idle and idle_timeout is not None:
+                # Nothing is happening, so sleep until something does,
+                # rather than redrawing an unchanged screen
+                timeout = idle_timeout
+                delay = self._screen.animation_delay()
+                if delay is not None:
+                    # but wake up for the next animation frame
+                    timeout = min(timeout, int(delay * 1000))
+                if timeout > 0:
+                    ev = wait_event(timeout)
+                    if ev.type != NOEVENT:
+                        events = [ev] + get_events()
+            if not self.step(events):
+                return
             self._fps = 1000.0 / clock.tick(
                     self._gd.constants.frame_rate)
 
+    def get_events(self):
+        """Fetch this frame's events from SDL and the event bus."""
+        events = pygame.event.get()
+        events.extend(get_event_bus().drain())
+        return events
+
+    def step(self, events):
+        """Process the events and draw a single frame.
+
+           Returns False once we've been asked to quit."""
+        record = self.metrics.record
+        start = default_timer()
+        if not self.process_events(events):
+            return False
+        events_done = default_timer()
+        # Install any images decoded in the background
+        loading = self._gd.resource.update_preload()
+        # Ping the screen / scene
+        animating = self._screen.animate()
+        animate_done = default_timer()
+        was_idle = self.idle
+        self.idle = not events and not animating and not loading
+        record('events', events_done - start)
+        record('animate', animate_done - events_done)
+        if self.idle and was_idle and not self._screen.has_dirty_rects():
+            # Nothing has changed since the last frame we drew
+            record('frame', animate_done - start)
+            return True
+        rects = self.draw()
+        draw_done = default_timer()
+        self.flip(rects)
+        flip_done = default_timer()
+        record('draw', draw_done - animate_done)
+        record('flip', flip_done - draw_done)
+        record('frame', flip_done - start)
+        return True
+
+    def process_events(self, events):
+        for ev in events:
+            if ev.type == QUIT:
+                return False
+            elif ev.type == MUSIC_ENDED:
+                self._gd.sound.music_ended()
+            elif ScreenChangeEvent.matches(ev):
+                self.set_screen(ev.screen_name)
+            elif ScreenEvent.matches(ev):
+                screen = self.screens[ev.screen_name]
+                screen.process_event(ev.event_name, ev.data)
+                screen.mark_dirty()
+            else:
+                self._screen.dispatch(ev)
+        return True
+
+    def draw(self):
+        """Draw the current screen to the display.
+
+           Returns the list of changed rects in dirty rect mode, or None
+           if the whole display needs updating."""
+        surface = pygame.display.get_surface()
+        overlay = self._metrics_overlay
+        if self.dirty_rects:
+            if overlay:
+                self._screen.mark_dirty(overlay.rect)
+            rects = self._screen.draw_dirty(surface)
+        else:
+            self._screen.draw(surface)
+            rects = None
+        if overlay:
+            overlay_rect = overlay.draw(surface, self._fps)
+            if rects is not None:
+                rects.append(overlay_rect)
+        return rects
+
+    def flip(self, rects):
+        if rects is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(rects)
+
+
+class HeadlessEngine(Engine):
+    """An engine for benchmarks and simulation.
+
+       Steps a fixed number of frames as fast as possible, without any
+       frame rate pacing. Events come from the pygame queue, the event
+       bus (for the events the game posts itself) and the optional
+       event_source, an iterable yielding a list of events for each
+       frame.
+
+       See GameDescription.headless_engine for setting one up."""
+
+    def __init__(self, gd, event_source=None):
+        super(HeadlessEngine, self).__init__(gd)
+        if event_source is None:
+            event_source = ()
+        self._event_source = iter(event_source)
+        self.frames = 0
+
+    def run(self, frames):
+        """Run for the given number of frames, or until we quit.
+
+           Returns the total number of frames run by this engine."""
+        get_events = self.get_events
+        for _ in range(frames):
+            start = default_timer()
+            events = get_events()
+            events.extend(next(self._event_source, ()))
+            if not self.step(events):
+                break
+            self.frames += 1
+            self._fps = 1.0 / (default_timer() - start)
+        return self.frames
+
 
 class Screen(object):
     """A top level object for the screen being displayed"""
 
+    # In dirty rect mode, redraw the whole screen once rather than each
+    # dirty region when they cover more than this fraction of it
+    FULL_REDRAW = 0.5
+
     def __init__(self, gd):
         # Avoid import loop
         from .widgets.base import Container
@@ -70,6 +294,9 @@ class Screen(object):
         self.surface_size = gd.constants.screen
         self.surface = None
         self.container = Container((0, 0), self.gd, self.surface_size)
+        if gd.constants.dirty_rects:
+            # The root container collects the regions its children report
+            self.container.dirty_rects = []
         self.setup()
 
     def on_enter(self):
@@ -77,6 +304,7 @@ class Screen(object):
         # Create the surface here as flipping between editor and
         # other things kills pygame.display
         self.surface = pygame.Surface(self.surface_size)
+        self.mark_dirty()
 
     def on_exit(self):
         """Called when this stops being the current screen."""
@@ -87,13 +315,48 @@ class Screen(object):
         pass
 
     def dispatch(self, ev):
+        if ev.type != MOUSEMOTION:
+            # Anything other than mouse motion may change game state
+            # arbitrarily, so we play safe and redraw everything. Widgets
+            # report the changes motion causes themselves.
+            self.mark_dirty()
         self.container.event(ev)
 
+    def mark_dirty(self, rect=None):
+        """Mark a region of the screen (default: all of it) for redrawing."""
+        if rect is None:
+            rect = pygame.Rect((0, 0), self.surface_size)
+        self.container.mark_dirty(rect)
+
+    def has_dirty_rects(self):
+        """Whether any regions have been marked dirty since they were last
+        drawn, in dirty rect mode."""
+        return bool(self.container.dirty_rects)
+
+    def pop_dirty_rects(self):
+        """Return the regions marked dirty since the last call."""
+        rects = self.container.dirty_rects
+        if not rects:
+            return []
+        self.container.dirty_rects = []
+        screen_rect = pygame.Rect((0, 0), self.surface_size)
+        return [rect.clip(screen_rect) for rect in rects]
+
     def animate(self):
         """Called every tick - used for peroidic events, etc.
 
-           Interested classes are expected to override this"""
-        pass
+           Interested classes are expected to override this, returning
+           True if anything needs to be redrawn. The engine may stop
+           drawing frames while this returns False and there are no
+           events to process."""
+        return False
+
+    def animation_delay(self):
+        """Return the time in seconds until something on the screen
+           next changes by itself, or None if nothing is animated.
+
+           The engine won't sleep past this while idle."""
+        return None
 
     def draw_background(self):
         self.surface.fill(pygame.Color('gray'))
@@ -104,6 +367,30 @@ class Screen(object):
             self.container.draw(self.surface)
             surface.blit(self.surface, self.surface.get_rect())
 
+    def draw_dirty(self, surface):
+        """Redraw only the regions marked dirty.
+
+           Returns the list of changed rects, suitable for passing to
+           pygame.display.update."""
+        rects = merge_rects(self.pop_dirty_rects())
+        screen_rect = pygame.Rect((0, 0), self.surface_size)
+        area = sum(rect.width * rect.height for rect in rects)
+        if area > screen_rect.width * screen_rect.height * self.FULL_REDRAW:
+            # Cheaper to redraw everything once than each region
+            self.draw(surface)
+            return [screen_rect]
+        for rect in rects:
+            surface.set_clip(rect)
+            if self.surface:
+                self.surface.set_clip(rect)
+            try:
+                self.draw(surface)
+            finally:
+                surface.set_clip(None)
+                if self.surface:
+                    self.surface.set_clip(None)
+        return rects
+
     def display_dialog(self, dialog):
         self.container.paused = True
         self.container.add(dialog)
@@ -122,18 +409,30 @@ class Screen(object):
 class UserEvent(object):
     """A user event type allowing subclassing,
        to provide an infinate number of user-defined events
+
+       Each distinct TYPE is given its own pygame event type the first
+       time it is used, so events can be told apart (and widget callbacks
+       found) without comparing strings.
     """
 
     TYPE = "UNKNOWN"
 
+    @classmethod
+    def event_type(cls):
+        """The pygame event type used for this event."""
+        try:
+            return _EVENT_TYPES[cls.TYPE]
+        except KeyError:
+            return _EVENT_TYPES.setdefault(cls.TYPE, allocate_event_type())
+
     @classmethod
     def post(cls, **kws):
-        ev = pygame.event.Event(USEREVENT, utype=cls.TYPE, **kws)
-        pygame.event.post(ev)
+        ev = pygame.event.Event(cls.event_type(), utype=cls.TYPE, **kws)
+        get_event_bus().post(ev)
 
     @classmethod
     def matches(cls, ev):
-        return ev.type == USEREVENT and ev.utype == cls.TYPE
+        return ev.type == cls.event_type()
 
 
 class ScreenChangeEvent(UserEvent):
@@ -11,6 +11,8 @@ from pygame.locals import MOUSEBUTTONDOWN, MOUSEMOTION, KEYDOWN, K_ESCAPE
 from .i18n import _
 from .cursor import CursorScreen
 from .engine import Screen
+from .prefetch import ScenePredictor
+from .saving import AutoSaver, StateJournal
 from .widgets.base import (Container, ModalStackContainer, ModalWrapper)
 from .widgets.text import TextButton, WrappedTextLabel
 from .widgets.imagebutton import ImageButtonWidget
@@ -26,7 +28,9 @@ class InventorySlot(ImageButtonWidget):
         self.add_callback(MOUSEBUTTONDOWN, self.mouse_down)
 
     def set_item(self, item):
-        self.item = item
+        if item is not self.item:
+            self.item = item
+            self.mark_dirty()
 
     def draw(self, surface):
         if self.item:
@@ -184,12 +188,24 @@ class SceneWidget(Container):
             self.screen.handle_result(result)
 
     def animate(self):
-        self.scene.animate()
+        if not self.scene.animate():
+            return False
+        if self.scene.changed_rects is None:
+            self.mark_dirty()
+        else:
+            for rect in self.scene.changed_rects:
+                self.mark_dirty(
+                    rect.move(self.rect.topleft).clip(self.rect))
+        return True
 
     def mouse_move(self, event, widget):
         pos = self.global_to_local(event.pos)
+        old_thing = self.scene.current_thing
         self.scene.mouse_move(pos)
         self.game.old_pos = event.pos
+        if self.scene.current_thing is not old_thing:
+            # The description label is drawn over the whole scene area
+            self.parent.mark_dirty()
 
     def close(self, event, widget):
         self.screen.close_detail(self)
@@ -243,11 +259,33 @@ class ToolBar(Container):
 
 class GameScreen(CursorScreen):
 
+    # The player's save slot, and the one autosaves go in
+    SAVE_NAME = 'savegame'
+    AUTOSAVE_NAME = 'autosave'
+
     def setup(self):
         super(GameScreen, self).setup()
         self.gd.running = False
         self.create_initial_state = self.gd.initial_state
         self.container.add_callback(KEYDOWN, self.key_pressed)
+        self.autosaver = None
+        self.journal = None
+        self.scene_modal = None
+        # Learns where the player goes, across games
+        self.predictor = ScenePredictor()
+        if self.gd.constants.autosave_interval is not None:
+            self.autosaver = AutoSaver(
+                self.gd.save_worker, self.get_save_dir(), self.AUTOSAVE_NAME,
+                self.gd.constants.autosave_interval)
+
+    def on_exit(self):
+        super(GameScreen, self).on_exit()
+        if self.autosaver and self.gd.running:
+            self.autosaver.save_now(self.game.data)
+
+    def request_autosave(self):
+        if self.autosaver:
+            self.autosaver.request()
 
     def _clear_all(self):
         self._message_queue = []
@@ -264,18 +302,38 @@ class GameScreen(CursorScreen):
         return self.gd.get_default_save_location()
 
     def game_event_load(self, data):
+        """Load the player's save, or the save named in data (e.g.
+        {'name': AUTOSAVE_NAME})."""
+        save_name = self.SAVE_NAME
+        if data and data.get('name'):
+            save_name = data['name']
+        # Make sure we load the latest save
+        self.gd.save_worker.flush()
         state = self.gd.game_state_class().load_game(
-            self.get_save_dir(), 'savegame')
+            self.get_save_dir(), save_name)
         # TODO: Handle this better.
         if state is not None:
             self.reset_game(state)
 
     def game_event_save(self, data):
-        self.game.data.save_game(self.get_save_dir(), 'savegame')
+        self.gd.save_worker.save(self.game.data, self.get_save_dir(),
+                                 self.SAVE_NAME)
 
     def reset_game(self, game_state=None):
+        if self.scene_modal is not None:
+            # Unpin the old game's images
+            for scene_widget in self.scene_modal.children:
+                scene_widget.scene.release_images()
         self._clear_all()
         self.game = self.create_initial_state(game_state)
+        if self.gd.constants.prefetch_scenes:
+            self.predictor.load_targets(self.game)
+        if self.gd.constants.state_journal:
+            if self.journal:
+                self.journal.close()
+            self.journal = StateJournal(
+                self.game.data, self.gd.save_worker, self.get_save_dir(),
+                self.AUTOSAVE_NAME, self.gd.constants.journal_compact_ops)
 
         self.screen_modal = self.container.add(
             ModalStackContainer(self.container.pos, self.gd,
@@ -299,6 +357,7 @@ class GameScreen(CursorScreen):
 
     def game_event_inventory(self, data):
         self.inventory.update_slots()
+        self.request_autosave()
 
     def game_event_change_scene(self, data):
         scene_name = data['name']
@@ -308,18 +367,39 @@ class GameScreen(CursorScreen):
             self.change_scene(scene_name)
 
     def change_scene(self, scene_name):
+        previous = self.scene_modal.top
         for scene_widget in reversed(self.scene_modal.children[:]):
             self.scene_modal.remove(scene_widget)
             scene_widget.scene.leave()
+            scene_widget.scene.release_images()
         self.game.data.set_current_scene(scene_name)
         self._add_scene(self.game.scenes[scene_name])
+        self._scene_changed(previous, (scene_name, False))
+        self.request_autosave()
 
     def show_detail(self, detail_name):
         detail_scene = self.game.detail_views[detail_name]
         if detail_scene.name == self.scene_modal.top.name:
             # Don't show the scene if we're already showing it
             return
+        previous = self.scene_modal.top
         self._add_scene(detail_scene, True)
+        self._scene_changed(previous, (detail_name, True))
+
+    def _scene_changed(self, previous, key):
+        """Learn from the scene change, and start decoding the images for
+        the scenes likely to follow."""
+        if previous is not None:
+            self.predictor.observe(
+                (previous.scene.name, previous.is_detail), key)
+        limit = self.gd.constants.prefetch_scenes
+        if not limit:
+            return
+        for name, is_detail in self.predictor.predict(self.game, key)[:limit]:
+            if is_detail:
+                self.game.detail_views[name].preload_images()
+            else:
+                self.game.scenes[name].preload_images()
 
     def _add_scene(self, scene, detail=False):
         pos = self.scene_modal.rect.topleft
@@ -331,6 +411,7 @@ class GameScreen(CursorScreen):
 
         self.scene_modal.add(SceneWidget(pos, self.gd, size, scene, self,
                                          detail))
+        scene.pin_images()
         self.handle_result(scene.enter())
 
     def close_detail(self, detail=None):
@@ -338,11 +419,28 @@ class GameScreen(CursorScreen):
             detail = self.scene_modal.top
         self.scene_modal.remove(detail)
         self.handle_result(detail.scene.leave())
+        detail.scene.release_images()
 
     def animate(self):
         """Animate the scene widgets"""
+        if self.autosaver:
+            self.autosaver.tick(self.game.data)
+        error = self.gd.save_worker.pop_error()
+        result = False
+        if error is not None:
+            self.show_message(_("Failed to save the game: %s") % (error,))
+            result = True
+        self.game.animation_clock.tick()
         for scene_widget in self.scene_modal.children:
-            scene_widget.animate()
+            if scene_widget.animate():
+                result = True
+        return result
+
+    def animation_delay(self):
+        delays = [scene_widget.scene.animation_delay()
+                  for scene_widget in self.scene_modal.children]
+        delays = [delay for delay in delays if delay is not None]
+        return min(delays) if delays else None
 
     def key_pressed(self, event, widget):
         if event.key == K_ESCAPE:
@@ -374,6 +472,9 @@ class GameScreen(CursorScreen):
 
     def handle_result(self, resultset):
         """Handle dealing with result or result sequences"""
+        # Interacting may have changed the state, even without a result
+        self.game.data.sync_journal()
+        self.request_autosave()
         if resultset:
             if hasattr(resultset, 'process'):
                 resultset = [resultset]
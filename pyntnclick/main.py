@@ -15,11 +15,12 @@ import pygame
 from pygame.locals import SWSURFACE
 
 from .i18n import _, get_module_i18n_path
-from .engine import Engine
+from .engine import Engine, HeadlessEngine
 from .gamescreen import DefMenuScreen, DefEndScreen, GameScreen
 from .constants import GameConstants, DEBUG_ENVVAR
 from .resources import Resources
 from .sound import Sound
+from .saving import SaveWorker
 from . import state
 
 from .tools.rect_drawer import (
@@ -71,7 +72,11 @@ class GameDescription(object):
         locale.setlocale(locale.LC_ALL, "")
         lang = locale.getdefaultlocale(['LANGUAGE', 'LC_ALL', 'LC_CTYPE',
                                         'LANG'])[0]
-        self.resource = Resources(self._resource_module, lang)
+        self.resource = Resources(self._resource_module, lang,
+                                  self.constants.image_cache_bytes,
+                                  self.constants.image_loader_threads)
+        if self.constants.scan_resources:
+            self.resource.scan()
         locale_path = self.resource.get_resource_path('locale')
         gettext.bindtextdomain(self.constants.short_name, locale_path)
         gettext.textdomain(self.constants.short_name)
@@ -80,6 +85,7 @@ class GameDescription(object):
         self._check_translations(popath, locale_path)
 
         self.sound = Sound(self.resource)
+        self.save_worker = SaveWorker()
         self.debug_options = []
         self.running = False
 
@@ -123,7 +129,7 @@ class GameDescription(object):
         # We flag these, so we can warn the user that these require debug mode
         self.debug_options = [
             '--scene', '--no-rects', '--rect-drawer',
-            '--list-scenes', '--details']
+            '--list-scenes', '--details', '--frame-metrics', '--explore']
         if self.constants.debug:
             parser.add_option(
                 "--scene", type="str", default=None,
@@ -144,6 +150,14 @@ class GameDescription(object):
             parser.add_option(
                 "--detail", type="str", default=None,
                 dest="detail", help="Detailed view for rect_drawer")
+            parser.add_option(
+                "--frame-metrics", action="store_true", default=False,
+                dest="frame_metrics", help="Show frame timings")
+            parser.add_option(
+                "--explore", action="store_true", default=False,
+                dest="explore",
+                help=("Try every reachable game state, report how to finish"
+                      " the game, dead ends and errors, and exit."))
         return parser
 
     def warn_debug(self, option):
@@ -174,6 +188,11 @@ class GameDescription(object):
         if self.constants.debug and opts.list_scenes:
             list_scenes(self.SCENE_MODULE, self._scene_list)
             sys.exit(0)
+        if self.constants.debug and opts.explore:
+            from .tools.explorer import StateExplorer
+            report = StateExplorer(type(self)).run()
+            print(report.format())
+            sys.exit(1 if report.errors or not report.completable else 0)
         if self.constants.debug and opts.rect_drawer:
             if opts.scene is None:
                 print('Need to supply a scene to use the rect drawer')
@@ -203,16 +222,41 @@ class GameDescription(object):
                 pygame.display.set_caption(title)
 
             self.engine = Engine(self)
-            # Initialize the special screens in the engine
-            for name, cls in self._screens.items():
-                screen = cls(self)
-                self.engine.add_screen(name, screen)
-            # Should we allow the menu not to be the opening screen?
-            self.engine.set_screen(self.START_SCREEN)
+            self._setup_engine()
+            if self.constants.debug and opts.frame_metrics:
+                self.engine.show_metrics()
         try:
             self.engine.run()
         except KeyboardInterrupt:
             pass
+        # Don't lose any saves still being written
+        self.save_worker.flush()
+
+    def _setup_engine(self):
+        # Initialize the special screens in the engine
+        for name, cls in self._screens.items():
+            screen = cls(self)
+            self.engine.add_screen(name, screen)
+        # Should we allow the menu not to be the opening screen?
+        self.engine.set_screen(self.START_SCREEN)
+
+    def headless_engine(self, event_source=None):
+        """Set up a HeadlessEngine for this game and return it.
+
+        This uses SDL's dummy video and audio drivers, so must be called
+        before anything else initialises pygame.
+        """
+        os.environ['SDL_VIDEODRIVER'] = 'dummy'
+        os.environ['SDL_AUDIODRIVER'] = 'dummy'
+        pygame.display.init()
+        pygame.font.init()
+        # convert_alpha() needs a video mode, but there's no window behind
+        # this one
+        pygame.display.set_mode(self.constants.screen)
+        self.sound.enable_sound(self.constants)
+        self.engine = HeadlessEngine(self, event_source)
+        self._setup_engine()
+        return self.engine
 
     def get_default_save_location(self):
         """Return a default save game location."""
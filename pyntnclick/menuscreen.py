@@ -5,6 +5,7 @@
 import pygame.event
 from pygame.locals import QUIT
 from .engine import Screen
+from .gamescreen import GameScreen
 from .widgets.imagebutton import ImageButtonWidget
 from .widgets.text import TextButton
 
@@ -19,6 +20,7 @@ class MenuScreen(Screen):
 
         self._add_new_game_button()
         self._add_load_game_button()
+        self._add_load_autosave_button()
         self._add_save_game_button()
         self._add_resume_game_button()
         self._add_quit_button()
@@ -28,6 +30,8 @@ class MenuScreen(Screen):
         running = self.check_running()
         self.set_button_state(self._resume_game_button, running)
         self.set_button_state(self._load_game_button, self.check_has_saves())
+        self.set_button_state(
+            self._load_autosave_button, self.check_has_autosave())
         self.set_button_state(self._save_game_button, running)
 
     def set_button_state(self, button, enabled):
@@ -45,6 +49,10 @@ class MenuScreen(Screen):
         "Override this to customise the load game button."
         return self.make_text_button((200, 200), 'Load game')
 
+    def make_load_autosave_button(self):
+        "Override this to customise the load autosave button."
+        return self.make_text_button((200, 150), 'Load autosave')
+
     def make_save_game_button(self):
         "Override this to customise the save game button."
         return self.make_text_button((200, 300), 'Save game')
@@ -65,6 +73,10 @@ class MenuScreen(Screen):
         self._load_game_button = self.make_load_game_button()
         self._load_game_button.add_callback('clicked', self.load_game)
 
+    def _add_load_autosave_button(self):
+        self._load_autosave_button = self.make_load_autosave_button()
+        self._load_autosave_button.add_callback('clicked', self.load_autosave)
+
     def _add_save_game_button(self):
         self._save_game_button = self.make_save_game_button()
         self._save_game_button.add_callback('clicked', self.save_game)
@@ -100,6 +112,10 @@ class MenuScreen(Screen):
         self.screen_event('game', 'load')
         self.change_screen('game')
 
+    def load_autosave(self, ev, widget):
+        self.screen_event('game', 'load', {'name': GameScreen.AUTOSAVE_NAME})
+        self.change_screen('game')
+
     def save_game(self, ev, widget):
         self.screen_event('game', 'save')
 
@@ -107,10 +123,14 @@ class MenuScreen(Screen):
         return self.gd.running
 
     def check_has_saves(self):
-        import os.path
         save_dir = self.gd.get_default_save_location()
-        return os.path.exists(
-            self.gd.game_state_class().get_save_fn(save_dir, 'savegame'))
+        return self.gd.game_state_class().has_save_game(
+            save_dir, GameScreen.SAVE_NAME)
+
+    def check_has_autosave(self):
+        save_dir = self.gd.get_default_save_location()
+        return self.gd.game_state_class().has_save_game(
+            save_dir, GameScreen.AUTOSAVE_NAME)
 
     def resume_game(self, ev, widget):
         self.change_screen('game')
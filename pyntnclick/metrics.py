@@ -0,0 +1,104 @@
+"""Frame timing instrumentation for the engine loop."""
+
+from __future__ import division
+
+import math
+from collections import deque
+
+import pygame
+from pygame.locals import SRCALPHA
+
+
+class FrameMetrics(object):
+    """Rolling per-phase timings of the engine loop.
+
+       Keeps the durations (in seconds) of the last `size` frames for
+       each phase in a ring buffer."""
+
+    PHASES = ('events', 'animate', 'draw', 'flip', 'frame')
+
+    def __init__(self, size):
+        self.size = size
+        self._samples = dict((phase, deque(maxlen=size))
+                             for phase in self.PHASES)
+
+    def record(self, phase, duration):
+        self._samples[phase].append(duration)
+
+    def samples(self, phase):
+        """Return the recorded durations for a phase, oldest first."""
+        return list(self._samples[phase])
+
+    def percentile(self, phase, percent):
+        """Return the given percentile of a phase's durations.
+
+           Uses the nearest-rank method. Returns None if we have no
+           samples yet."""
+        samples = sorted(self._samples[phase])
+        if not samples:
+            return None
+        rank = int(math.ceil(percent / 100 * len(samples)))
+        return samples[max(rank - 1, 0)]
+
+    def summary(self, percents=(50, 90, 99)):
+        """Return a dict of phase -> list of the given percentiles."""
+        return dict((phase, [self.percentile(phase, p) for p in percents])
+                    for phase in self.PHASES)
+
+    def clear(self):
+        for samples in self._samples.values():
+            samples.clear()
+
+
+class MetricsOverlay(object):
+    """Debug overlay showing the frame timing percentiles."""
+
+    POS = (5, 5)
+    FONT_SIZE = 12
+    COLOR = (255, 255, 0)
+    BG_COLOR = (0, 0, 0, 180)
+    PADDING = 3
+
+    def __init__(self, gd, metrics):
+        self.gd = gd
+        self.metrics = metrics
+        # Re-rendering the text is comparatively expensive, so only do it
+        # about once a second
+        self.refresh = gd.constants.frame_rate
+        self.rect = pygame.Rect(self.POS, (0, 0))
+        self._frames = 0
+        self._surface = None
+
+    def get_lines(self, fps):
+        lines = ['fps %5.1f      p50    p90    p99 (ms)' % (fps,)]
+        summary = self.metrics.summary()
+        for phase in self.metrics.PHASES:
+            values = [1000 * v if v is not None else 0
+                      for v in summary[phase]]
+            lines.append('%-8s %9.2f %6.2f %6.2f' % tuple([phase] + values))
+        return lines
+
+    def render(self, fps):
+        font = self.gd.resource.get_font(
+            self.gd.constants.mono_font, self.FONT_SIZE)
+        lines = [font.render(line, True, self.COLOR)
+                 for line in self.get_lines(fps)]
+        width = max(line.get_width() for line in lines)
+        height = sum(line.get_height() for line in lines)
+        self._surface = pygame.Surface(
+            (width + 2 * self.PADDING, height + 2 * self.PADDING), SRCALPHA)
+        self._surface.fill(self.BG_COLOR)
+        top = self.PADDING
+        for line in lines:
+            self._surface.blit(line, (self.PADDING, top))
+            top += line.get_height()
+        self.rect = self._surface.get_rect(topleft=self.POS)
+
+    def draw(self, surface, fps):
+        """Draw the overlay, returning the rect drawn to."""
+        if self._surface is None or self._frames >= self.refresh:
+            self._frames = 0
+            self.render(fps)
+        self._frames += 1
+        surface.blit(self._surface, self.rect)
+        return self.rect
@@ -0,0 +1,131 @@
+# -*- test-case-name: pyntnclick.tests.test_prefetch -*-
+"""Guessing which scenes the player will visit next, so their images can
+be decoded before they're needed."""
+
+import ast
+import inspect
+import sys
+import textwrap
+from collections import Counter
+
+from .utils import str_type
+
+
+def _string(node):
+    if type(node).__name__ not in ('Str', 'Constant'):
+        return None
+    value = node.value if hasattr(node, 'value') else node.s
+    if isinstance(value, str_type):
+        return value
+    return None
+
+
+def _call_name(node):
+    func = node.func
+    if isinstance(func, ast.Attribute):
+        return func.attr
+    if isinstance(func, ast.Name):
+        return func.id
+    return None
+
+
+def find_scene_targets(source):
+    """Find the scenes and detail views some code can change to.
+
+    Returns a set of (name, is_detail) for the string literals passed to
+    change_scene, show_detail and Result's detail_view."""
+    targets = set()
+    for node in ast.walk(ast.parse(textwrap.dedent(source))):
+        if not isinstance(node, ast.Call):
+            continue
+        name = _call_name(node)
+        if name in ('change_scene', 'show_detail'):
+            target = _string(node.args[0]) if node.args else None
+            if target is not None:
+                targets.add((target, name == 'show_detail'))
+        elif name == 'Result':
+            args = [kw.value for kw in node.keywords
+                    if kw.arg == 'detail_view'] + node.args[2:3]
+            for arg in args:
+                target = _string(arg)
+                if target is not None:
+                    targets.add((target, True))
+    return targets
+
+
+# map of class -> set of (name, is_detail) its code refers to
+_CLASS_TARGETS = {}
+
+
+def get_class_targets(cls):
+    """The scene targets in the source of a class and its bases."""
+    try:
+        return _CLASS_TARGETS[cls]
+    except KeyError:
+        pass
+    targets = set()
+    if getattr(sys, 'frozen', False):
+        # Frozen builds don't ship the source, so don't go looking for it
+        _CLASS_TARGETS[cls] = targets
+        return targets
+    for klass in cls.__mro__:
+        if klass is object:
+            continue
+        try:
+            source = inspect.getsource(klass)
+            targets.update(find_scene_targets(source))
+        except (IOError, TypeError, SyntaxError):
+            # Built in, or we can't find (or parse) the source
+            continue
+    _CLASS_TARGETS[cls] = targets
+    return targets
+
+
+class ScenePredictor(object):
+    """Predicts the scenes and detail views reachable from a scene.
+
+    Predictions come from the transitions we've seen the player make, most
+    frequent first, followed by those found in the code of the scene and
+    its things by load_targets(). Scenes are identified by (name,
+    is_detail)."""
+
+    def __init__(self):
+        # map of (name, is_detail) -> Counter of the scenes changed to
+        self._observed = {}
+        # map of (name, is_detail) -> scenes found in its code
+        self._static = {}
+
+    def observe(self, source, target):
+        """Record a change from the source scene to the target scene."""
+        if source is not None and source != target:
+            self._observed.setdefault(source, Counter())[target] += 1
+
+    def static_targets(self, scene):
+        targets = set(get_class_targets(type(scene)))
+        for thing in scene.things.values():
+            targets.update(get_class_targets(type(thing)))
+        return targets
+
+    def load_targets(self, game):
+        """Find the scenes in the code of all the game's scenes and detail
+        views, when they're loaded, as reading the source is too slow to
+        do while changing scenes."""
+        for is_detail, scenes in ((False, game.scenes),
+                                  (True, game.detail_views)):
+            for name, scene in scenes.items():
+                self._static[(name, is_detail)] = self.static_targets(scene)
+
+    def predict(self, game, key):
+        """Return the scenes (and detail views) likely to follow the given
+        one, most likely first."""
+        predicted = []
+        observed = self._observed.get(key, Counter())
+        for target, _count in observed.most_common():
+            if target not in predicted:
+                predicted.append(target)
+        for target in sorted(self._static.get(key, ())):
+            if target not in predicted:
+                predicted.append(target)
+        return [target for target in predicted
+                if target != key and target[0] in (
+                    game.detail_views if target[1] else game.scenes)]
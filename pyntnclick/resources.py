@@ -1,35 +1,337 @@
 # -*- test-case-name: pyntnclick.tests.test_resources -*-
 
+import logging
 import os
+import threading
+import weakref
+from collections import OrderedDict
 from pkg_resources import resource_filename
 
 import pygame
 
+from .assetpack import AssetPack, PACK_NAME
+from .utils import LRUCache
+
+log = logging.getLogger(__name__)
+
 
 class ResourceNotFound(Exception):
     pass
 
 
+def image_bytes(image):
+    """The memory used by an image's pixels."""
+    return image.get_pitch() * image.get_height()
+
+
+class ImageCache(LRUCache):
+    """Least recently used cache of images, holding at most max_bytes of
+    pixel data (or any amount if max_bytes is None).
+
+    Pinned images are never evicted. Evicted images that are still in use
+    elsewhere are handed back if asked for again, rather than loaded a
+    second time.
+    """
+
+    def __init__(self, max_bytes=None):
+        super(ImageCache, self).__init__(max_bytes, image_bytes)
+        # map of key -> pin count
+        self._pins = {}
+        # evicted images, while they're still alive
+        self._evicted_images = weakref.WeakValueDictionary()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def bytes(self):
+        return self.total_size
+
+    def has(self, key):
+        """Whether get() would return an image, either cached or evicted
+        but still in use elsewhere, without counting a hit or miss."""
+        return (key in self._entries
+                or self._evicted_images.get(key) is not None)
+
+    def get(self, key):
+        """Return the cached image, or None."""
+        image = super(ImageCache, self).get(key)
+        if image is None:
+            image = self._evicted_images.pop(key, None)
+            if image is None:
+                self.misses += 1
+                return None
+            self[key] = image
+        self.hits += 1
+        return image
+
+    def pin(self, key):
+        """Keep an image in the cache until it's unpinned."""
+        self._pins[key] = self._pins.get(key, 0) + 1
+
+    def unpin(self, key):
+        """Let a pinned image be evicted again. Keys that aren't pinned
+        are ignored."""
+        count = self._pins.pop(key, 0) - 1
+        if count > 0:
+            self._pins[key] = count
+        else:
+            self._evict()
+
+    def _can_evict(self, key):
+        return key not in self._pins
+
+    def _evicted(self, key, image):
+        self.evictions += 1
+        self._evicted_images[key] = image
+
+    def clear(self):
+        super(ImageCache, self).clear()
+        self._evicted_images.clear()
+
+    def stats(self):
+        return {
+            'images': len(self._entries),
+            'bytes': self.bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            }
+
+
+class ImageLoader(object):
+    """Decodes images on a pool of background threads.
+
+    pygame.image.load releases the GIL while decoding, so images decode
+    in parallel with the game. Converting an image needs the display, so
+    decoded images are handed back to the main thread by update(), which
+    converts them and installs them in the cache.
+    """
+
+    def __init__(self, threads=2, load=pygame.image.load):
+        self.threads = threads
+        self._load = load
+        self._cond = threading.Condition()
+        # paths waiting to be decoded, in order (the values are unused)
+        self._queue = OrderedDict()
+        # paths being decoded
+        self._busy = set()
+        # map of path -> decoded image, exception, or None if taken
+        self._done = OrderedDict()
+        # list of [paths not yet done, total, progress callback]
+        self._jobs = []
+        self._workers = []
+
+    def load(self, paths, callback=None):
+        """Queue images to decode.
+
+        callback(done, total) is called by update() as they're finished,
+        or straight away if there's nothing to do.
+        """
+        paths = list(OrderedDict.fromkeys(paths))
+        if not paths:
+            if callback is not None:
+                callback(0, 0)
+            return
+        with self._cond:
+            for path in paths:
+                if path not in self._busy and path not in self._done:
+                    self._queue[path] = None
+            self._jobs.append([set(paths), len(paths), callback])
+            while len(self._workers) < min(self.threads, len(self._queue)):
+                worker = threading.Thread(target=self._run)
+                worker.daemon = True
+                worker.start()
+                self._workers.append(worker)
+            self._cond.notify_all()
+
+    def loading(self):
+        """Whether any images are still to be decoded or installed."""
+        return bool(self._jobs)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+                path, _ = self._queue.popitem(last=False)
+                self._busy.add(path)
+            try:
+                image = self._load(path)
+            except Exception as e:
+                image = e
+            with self._cond:
+                self._busy.discard(path)
+                self._done[path] = image
+                self._cond.notify_all()
+
+    def take(self, path):
+        """Return the decoded image for the path, waiting for it if it's
+        being decoded, or None if it isn't loading (or failed).
+
+        The main thread calls this rather than decoding an image that's
+        already on its way."""
+        with self._cond:
+            if path in self._queue:
+                # Not started, so the caller may as well decode it
+                del self._queue[path]
+                self._done[path] = None
+                return None
+            while path in self._busy:
+                self._cond.wait()
+            image = self._done.get(path)
+            if path in self._done:
+                self._done[path] = None
+        if isinstance(image, Exception):
+            return None
+        return image
+
+    def update(self, install, max_images=None):
+        """Call install(path, image) for decoded images, and report
+        progress. Returns the number of images installed."""
+        installed = 0
+        with self._cond:
+            done = []
+            while self._done and (max_images is None
+                                  or len(done) < max_images):
+                done.append(self._done.popitem(last=False))
+        for path, image in done:
+            if image is not None and not isinstance(image, Exception):
+                install(path, image)
+                installed += 1
+        finished = set(path for path, image in done)
+        for job in self._jobs[:]:
+            if not job[0] & finished:
+                continue
+            job[0] -= finished
+            if not job[0]:
+                self._jobs.remove(job)
+            if job[2] is not None:
+                job[2](job[1] - len(job[0]), job[1])
+        return installed
+
+
 class Resources(object):
     """Resource loader and manager.
 
     The `CONVERT_ALPHA` flag allows alpha conversions to be disabled so that
     images may be loaded without having a display initialised. This is useful
     in unit tests, for example.
+
+    If a resource module contains an asset pack (see
+    pyntnclick.tools.pack_resources), the files in it are loaded from the
+    pack, in preference to any files of the same name.
     """
 
     DEFAULT_RESOURCE_MODULE = "pyntnclick.data"
     CONVERT_ALPHA = True
 
-    def __init__(self, resource_module, language=None):
+    def __init__(self, resource_module, language=None,
+                 image_cache_bytes=None, image_loader_threads=2):
         self.resource_module = resource_module
         self.lang_dialect = language
         self.language = language
         if language:
             self.language = language.split('_', 1)[0]
-        self._image_cache = {}
+        # images, with and without transforms, keyed by (path, transforms)
+        self.image_cache = ImageCache(image_cache_bytes)
+        self.image_loader = ImageLoader(
+            image_loader_threads, self._load_image_file)
         self._font_cache = {}
-        self._transformed_image_cache = {}
+        # map of path fragments -> path found, or None if it wasn't
+        self._path_cache = {}
+        # set of all the paths in the resource modules, if scanned
+        self._scanned_paths = None
+        # the directories of the modules scanned, with a trailing separator
+        self._scanned_dirs = ()
+        # map of path -> (pack, name) for the files in asset packs, or
+        # None for the directories
+        self._packed_paths = {}
+        self._load_packs()
+
+    def _load_packs(self):
+        for module in [self.resource_module, self.DEFAULT_RESOURCE_MODULE]:
+            pack_path = resource_filename(module, PACK_NAME)
+            if not os.path.exists(pack_path):
+                continue
+            pack = AssetPack(pack_path)
+            pack_mtime = os.path.getmtime(pack_path)
+            root = os.path.normpath(os.path.dirname(pack_path))
+            stale = 0
+            for name in pack.names():
+                path = os.path.normpath(os.path.join(root, *name.split('/')))
+                if self._is_newer(path, pack_mtime):
+                    # Changed since the pack was built, so use the file
+                    stale += 1
+                    continue
+                self._packed_paths[path] = (pack, name)
+                path = os.path.dirname(path)
+                while path != root and path not in self._packed_paths:
+                    self._packed_paths[path] = None
+                    path = os.path.dirname(path)
+            if stale:
+                log.warning(
+                    '%d files are newer than %s, so are loaded from the'
+                    ' filesystem instead. Rebuild it with'
+                    ' pyntnclick.tools.pack_resources.', stale, pack_path)
+
+    def _is_newer(self, path, mtime):
+        try:
+            return os.path.getmtime(path) > mtime
+        except OSError:
+            # Only in the pack
+            return False
+
+    def scan(self):
+        """Index all the files in the resource modules up front, so
+        looking up resources needs no filesystem access.
+
+        Symlinked directories are followed. A module that isn't unpacked
+        can't be listed, so is skipped and its resources are looked up on
+        the filesystem as before."""
+        paths = set()
+        dirs = []
+        for module in [self.resource_module, self.DEFAULT_RESOURCE_MODULE]:
+            top = os.path.normpath(resource_filename(module, ''))
+            if not os.path.isdir(top):
+                continue
+            dirs.append(os.path.join(top, ''))
+            for dirpath, dirnames, filenames in os.walk(
+                    top, followlinks=True):
+                paths.add(os.path.normpath(dirpath))
+                paths.update(os.path.normpath(os.path.join(dirpath, name))
+                             for name in filenames)
+        self._scanned_paths = paths
+        self._scanned_dirs = tuple(dirs)
+        self._path_cache.clear()
+
+    def clear_path_cache(self):
+        """Forget the paths we've found (or not found), for when the
+        resources change."""
+        self._path_cache.clear()
+        self._scanned_paths = None
+        self._scanned_dirs = ()
+
+    def _exists(self, path):
+        path = os.path.normpath(path)
+        if path in self._packed_paths:
+            return True
+        if path.startswith(self._scanned_dirs):
+            return path in self._scanned_paths
+        return os.path.exists(path)
+
+    def resource_source(self, path):
+        """Return what to pass to pygame to load the resource at path: a
+        file object if it's in an asset pack, or else the path."""
+        packed = self._packed_paths.get(os.path.normpath(path))
+        if packed is None:
+            return path
+        pack, name = packed
+        return pack.open(name)
+
+    def _load_image_file(self, image_path):
+        return pygame.image.load(self.resource_source(image_path),
+                                 image_path)
 
     def get_resource_path(self, *resource_path_fragments):
         """Find the resource in one of a number of different places.
@@ -45,13 +347,29 @@ class Resources(object):
 
         If the `language` attribute is `None`, the paths with <lang> in them
         are skipped.
+
+        The result, found or not, is cached.
         """
+        try:
+            path = self._path_cache[resource_path_fragments]
+        except KeyError:
+            path = self._path_cache[resource_path_fragments] = (
+                self._find_resource_path(resource_path_fragments))
+        if path is None:
+            raise ResourceNotFound(
+                self._resource_name(resource_path_fragments))
+        return path
+
+    def _resource_name(self, resource_path_fragments):
         resource_name = '/'.join(resource_path_fragments)
-        resource_name = os.path.join(*resource_name.split('/'))
+        return os.path.join(*resource_name.split('/'))
+
+    def _find_resource_path(self, resource_path_fragments):
+        resource_name = self._resource_name(resource_path_fragments)
         for path in self.get_paths(resource_name):
-            if os.path.exists(path):
+            if self._exists(path):
                 return path
-        raise ResourceNotFound(resource_name)
+        return None
 
     def get_paths(self, resource_path):
         """Get list of resource paths to search.
@@ -87,25 +405,87 @@ class Resources(object):
 
         image_path = self.get_resource_path(basedir, *image_name_fragments)
 
-        key = (image_path, transforms)
-        if key in self._transformed_image_cache:
+        key = (image_path, tuple(transforms))
+        image = self.image_cache.get(key)
+        if image is not None:
             # We already have this cached, so shortcut the whole process.
-            return self._transformed_image_cache[key]
+            return image
 
-        if image_path not in self._image_cache:
-            image = pygame.image.load(image_path)
-            if self.CONVERT_ALPHA:
-                image = image.convert_alpha(pygame.display.get_surface())
-            self._image_cache[image_path] = image
-        image = self._image_cache[image_path]
+        base_key = (image_path, ())
+        base_image = None
+        if key != base_key:
+            base_image = self.image_cache.get(base_key)
+        if base_image is None:
+            base_image = self.image_loader.take(image_path)
+            if base_image is None:
+                base_image = self._load_image_file(image_path)
+            base_image = self._convert(base_image)
+            self.image_cache[base_key] = base_image
 
         # Apply any transforms we're given.
+        image = base_image
         for transform in transforms:
             image = transform(image)
-        self._transformed_image_cache[key] = image
+        if image is not base_image:
+            self.image_cache[key] = image
 
         return image
 
+    def _convert(self, image):
+        if self.CONVERT_ALPHA:
+            image = image.convert_alpha(pygame.display.get_surface())
+        return image
+
+    def _install_image(self, image_path, image):
+        key = (image_path, ())
+        if not self.image_cache.has(key):
+            self.image_cache[key] = self._convert(image)
+
+    def _image_keys(self, image_names, basedir):
+        keys = []
+        for name in image_names:
+            if not isinstance(name, tuple):
+                name = (name,)
+            try:
+                path = self.get_resource_path(basedir, *name)
+            except ResourceNotFound:
+                continue
+            keys.append((path, ()))
+        return keys
+
+    def pin_images(self, image_names, basedir='images'):
+        """Keep images in the cache while they're in use, however full it
+        gets. Returns the keys pinned, to pass to unpin_images."""
+        keys = self._image_keys(image_names, basedir)
+        for key in keys:
+            self.image_cache.pin(key)
+        return keys
+
+    def unpin_images(self, keys):
+        """Let images pinned by pin_images be evicted again."""
+        for key in keys:
+            self.image_cache.unpin(key)
+
+    def preload_images(self, image_names, callback=None, basedir='images'):
+        """Start decoding images in the background, so get_image doesn't
+        have to wait for them.
+
+        image_names are names as passed to get_image, with tuples for
+        names in several fragments. Images we can't find are skipped.
+        update_preload must be called regularly from the main thread to
+        install them, calling callback(done, total) as it goes.
+        """
+        paths = [path for path, _ in self._image_keys(image_names, basedir)
+                 if not self.image_cache.has((path, ()))]
+        self.image_loader.load(paths, callback)
+
+    def update_preload(self, max_images=None):
+        """Install the images decoded in the background so far.
+
+        Returns True while there are more images to come."""
+        self.image_loader.update(self._install_image, max_images)
+        return self.image_loader.loading()
+
     def get_font(self, file_name, font_size, basedir=None):
         """Load a a font, cached if possible."""
         if basedir is None:
@@ -113,5 +493,6 @@ class Resources(object):
         key = (basedir, file_name, font_size)
         if key not in self._font_cache:
             fontfn = self.get_resource_path(basedir, file_name)
-            self._font_cache[key] = pygame.font.Font(fontfn, font_size)
+            self._font_cache[key] = pygame.font.Font(
+                self.resource_source(fontfn), font_size)
         return self._font_cache[key]
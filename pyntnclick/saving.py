@@ -0,0 +1,296 @@
+"""Writing save games in the background."""
+
+from __future__ import print_function
+
+import binascii
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from timeit import default_timer
+
+from .utils import atomic_write
+
+log = logging.getLogger(__name__)
+
+
+class SaveWorker(object):
+    """Writes save games on a background thread.
+
+       The state is snapshotted on the calling thread, and then encoded and
+       written by the worker. Each save is numbered when it's requested,
+       and written in that order; if several saves to the same file are
+       waiting, only the latest one is written, and a save is never written
+       over a later one.
+
+       callback(data), if given, is called from the worker thread once the
+       data (or that of a later save to the same file) has been written."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        # map of (save_dir, save_name) -> (seq, state class, data, callbacks)
+        self._pending = OrderedDict()
+        # map of (save_dir, save_name) -> seq of the last save written
+        self._written = {}
+        self._seq = 0
+        self._busy = False
+        self._thread = None
+        self.last_error = None
+
+    def save(self, state, save_dir, save_name, callback=None):
+        data = state.export_save_data()
+        key = (save_dir, save_name)
+        with self._cond:
+            self._seq += 1
+            callbacks = []
+            if key in self._pending:
+                callbacks = self._pending.pop(key)[3]
+            if callback is not None:
+                callbacks.append(callback)
+            self._pending[key] = (self._seq, type(state), data, callbacks)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run)
+                self._thread.daemon = True
+                self._thread.start()
+            self._cond.notify_all()
+
+    def pop_error(self):
+        """Return the last error saving, if there's been one since we
+        were last asked, so it can be reported."""
+        with self._cond:
+            error, self.last_error = self.last_error, None
+        return error
+
+    def flush(self):
+        """Wait for all the requested saves to be written."""
+        with self._cond:
+            while self._pending or self._busy:
+                self._cond.wait()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+                while not self._pending:
+                    self._cond.wait()
+                key, (seq, state_class, data, callbacks) = (
+                    self._pending.popitem(last=False))
+                if seq <= self._written.get(key, 0):
+                    # Stale
+                    continue
+                self._busy = True
+            save_dir, save_name = key
+            try:
+                state_class.write_save_data(save_dir, save_name, data)
+            except Exception as e:
+                log.exception('Failed to save game %s', save_name)
+                with self._cond:
+                    self.last_error = e
+                continue
+            with self._cond:
+                self._written[key] = seq
+            for callback in callbacks:
+                try:
+                    callback(data)
+                except Exception as e:
+                    log.exception(
+                        'Failed after saving game %s', save_name)
+                    with self._cond:
+                        self.last_error = e
+
+
+class AutoSaver(object):
+    """Coalesces requests to save into at most one write per interval.
+
+       Call request() whenever the game state may have changed, and tick()
+       regularly (e.g. once a frame) to write the state when due."""
+
+    def __init__(self, worker, save_dir, save_name, interval,
+                 clock=default_timer):
+        self.worker = worker
+        self.save_dir = save_dir
+        self.save_name = save_name
+        self.interval = interval
+        self._clock = clock
+        self._requested = False
+        self._last_save = None
+
+    def request(self):
+        self._requested = True
+
+    def tick(self, state):
+        """Save the state if a save was requested and one is due."""
+        if not self._requested:
+            return False
+        now = self._clock()
+        if (self._last_save is not None
+                and now - self._last_save < self.interval):
+            return False
+        return self.save_now(state)
+
+    def save_now(self, state):
+        """Save the state now, if a save was requested."""
+        if not self._requested:
+            return False
+        self._requested = False
+        self._last_save = self._clock()
+        self.worker.save(state, self.save_dir, self.save_name)
+        return True
+
+
+class StateJournal(object):
+    """Append-only journal of changes to the game state.
+
+       Each change is appended to <save_name>.journal as a line of JSON
+       and synced to disk, so a crash loses at most the change being
+       written. Every compact_ops changes the full state is saved by the
+       SaveWorker, and once that save is in place the worker thread
+       rewrites the journal with just the changes since.
+       GameState.load_game replays the journal on top of the last save.
+
+       The saved state records the journal session and the last change it
+       includes, so replaying ignores journals from other games and
+       changes the save already has. Changes are recorded as the new value
+       of a whole entry, so replaying one twice is harmless.
+
+       A new journal leaves the save alone until the first change, so
+       starting a game and leaving it again doesn't lose the previous
+       session's progress. It then saves the full state, and only starts
+       the journal once that save is written, so until then the previous
+       save and journal stay consistent."""
+
+    def __init__(self, state, worker, save_dir, save_name, compact_ops):
+        self.state = state
+        self.worker = worker
+        self.save_dir = save_dir
+        self.save_name = save_name
+        self.compact_ops = compact_ops
+        self.session = binascii.hexlify(os.urandom(8)).decode('ascii')
+        self.seq = 0
+        self._ops = 0
+        self._started = False
+        # guards the journal file, which the worker thread rewrites
+        self._lock = threading.Lock()
+        self._file = None
+        self._closed = False
+        # (seq, encoded change) for the changes not in the last save
+        # known to be written
+        self._entries = []
+        # seq of the save the journal file follows on from
+        self._file_seq = None
+        state.journal = self
+
+    @classmethod
+    def get_journal_fn(cls, save_dir, save_name):
+        return os.path.join(save_dir, '%s.journal' % (save_name,))
+
+    def position(self):
+        """The point in the journal the current state corresponds to."""
+        return {'session': self.session, 'seq': self.seq}
+
+    def record(self, op, *args):
+        self.seq += 1
+        # Encode now, as args may be changed in place later
+        line = self._encode([self.seq, op] + list(args))
+        with self._lock:
+            self._entries.append((self.seq, line))
+            if self._file is not None:
+                self._write(line)
+        self._ops += 1
+        if not self._started or self._ops >= self.compact_ops:
+            # The first change starts from a full save, so older journals
+            # can't apply
+            self._started = True
+            self.compact()
+
+    @staticmethod
+    def _encode(entry):
+        return json.dumps(entry, separators=(',', ':')) + '\n'
+
+    def _write(self, line):
+        self._file.write(line)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def _saved(self, data):
+        """Start a new journal following on from the save just written.
+
+        This is called from the worker thread."""
+        position = data.get('_journal')
+        if position is None or position['session'] != self.session:
+            return
+        saved_seq = position['seq']
+        with self._lock:
+            if self._closed or saved_seq == self._file_seq:
+                return
+            self._close_file()
+            self._entries = [entry for entry in self._entries
+                             if entry[0] > saved_seq]
+            fn = self.get_journal_fn(self.save_dir, self.save_name)
+            with atomic_write(fn, 'w') as f:
+                f.write(self._encode({'session': self.session}))
+                for _seq, line in self._entries:
+                    f.write(line)
+            self._file = open(fn, 'a')
+            self._file_seq = saved_seq
+
+    def compact(self):
+        """Save the full state in the background, so the journal can be
+        emptied once it's written."""
+        self._ops = 0
+        self.worker.save(self.state, self.save_dir, self.save_name,
+                         self._saved)
+
+    def flush(self):
+        """Wait for the last compaction, and the journal after it."""
+        self.worker.flush()
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            self._close_file()
+
+    @classmethod
+    def replay(cls, data, save_dir, save_name):
+        """Apply the journalled changes newer than the saved data to it."""
+        position = data.pop('_journal', None)
+        fn = cls.get_journal_fn(save_dir, save_name)
+        if position is None or not os.access(fn, os.R_OK):
+            return data
+        f = open(fn, 'r')
+        lines = f.readlines()
+        f.close()
+        try:
+            header = json.loads(lines[0])
+        except (IndexError, ValueError):
+            return data
+        if header.get('session') != position['session']:
+            return data
+        for line in lines[1:]:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # A change that was only partly written when we crashed
+                break
+            seq, op, args = entry[0], entry[1], entry[2:]
+            if seq > position['seq']:
+                cls._apply(data, op, args)
+        return data
+
+    @classmethod
+    def _apply(cls, data, op, args):
+        if op == 'entry':
+            state_key, value = args
+            data[state_key] = value
+        elif op == 'inventory':
+            name, items = args
+            data.setdefault('inventories', {})[name] = items
+        elif op == 'scene':
+            data['current_scene'] = args[0]
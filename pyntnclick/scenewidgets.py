@@ -27,6 +27,27 @@ class Interact(object):
     def animate(self):
         return False
 
+    def is_animated(self):
+        """Whether this needs animate() calling."""
+        return type(self).animate != Interact.animate
+
+    def animation_delay(self, clock):
+        """Return the time in seconds until animate() may next change
+        something, or None if it never will. By default that's the next
+        frame of the game's AnimationClock."""
+        if not self.is_animated():
+            return None
+        return clock.time_to_next_frame()
+
+    def is_static(self):
+        """Whether this always draws the same, so scenes can cache it."""
+        return type(self).draw == Interact.draw and not self.is_animated()
+
+    def get_image_names(self):
+        """The names of the images set_thing loads from the thing's
+        folder."""
+        return []
+
 
 class InteractNoImage(Interact):
 
@@ -111,8 +132,29 @@ class InteractUnion(Interact):
             sub_interact.draw(surface)
 
     def animate(self):
+        result = False
         for sub_interact in self._interact_list:
-            sub_interact.animate()
+            if sub_interact.animate():
+                result = True
+        return result
+
+    def is_animated(self):
+        return any(sub_interact.is_animated()
+                   for sub_interact in self._interact_list)
+
+    def animation_delay(self, clock):
+        delays = [sub_interact.animation_delay(clock)
+                  for sub_interact in self._interact_list]
+        delays = [delay for delay in delays if delay is not None]
+        return min(delays) if delays else None
+
+    def is_static(self):
+        return all(sub_interact.is_static()
+                   for sub_interact in self._interact_list)
+
+    def get_image_names(self):
+        return [name for sub_interact in self._interact_list
+                for name in sub_interact.get_image_names()]
 
 
 class InteractImage(Interact):
@@ -127,6 +169,9 @@ class InteractImage(Interact):
         self.rect = Rect(self._pos, self.image.get_size())
         self.interact_rect = self.rect
 
+    def get_image_names(self):
+        return [self._image_name]
+
     def __repr__(self):
         return '<InteractImage: %s>' % self._image_name
 
@@ -152,32 +197,81 @@ class InteractAnimated(Interact):
         self._pos = (x, y)
         self._anim_pos = 0
         self._names = anim_seq
-        self._frame_count = 0
         self._anim_seq = None
         self._delay = delay
+        # the game's AnimationClock
+        self._clock = None
+
+    def _load_frames(self, thing):
+        return [thing.resource.get_image(thing.folder, x)
+                for x in self._names]
 
     def set_thing(self, thing):
-        self._anim_seq = [thing.resource.get_image(thing.folder, x)
-                          for x in self._names]
+        self._anim_seq = self._load_frames(thing)
         self.image = self._anim_seq[0]
         self.rect = Rect(self._pos, self.image.get_size())
         for image in self._anim_seq:
             assert image.get_size() == self.rect.size
         self.interact_rect = self.rect
+        self._clock = thing.game.animation_clock
+
+    def get_image_names(self):
+        return list(self._names)
 
     def animate(self):
         if self._anim_seq:
-            self._frame_count += 1
-            if self._frame_count > self._delay:
-                self._frame_count = 0
-                self._anim_pos += 1
-                if self._anim_pos >= len(self._anim_seq):
-                    self._anim_pos = 0
-                self.image = self._anim_seq[self._anim_pos]
+            anim_pos = ((self._clock.frame // (self._delay + 1))
+                        % len(self._anim_seq))
+            if anim_pos != self._anim_pos:
+                self._anim_pos = anim_pos
+                self.image = self._anim_seq[anim_pos]
                 # queue redraw
                 return True
         return False
 
+    def animation_delay(self, clock):
+        if not self._anim_seq or len(self._anim_seq) < 2:
+            return None
+        # The image changes every delay + 1 frames
+        period = self._delay + 1
+        return clock.time_to_frame((clock.frame // period + 1) * period)
+
+
+class InteractSpriteSheet(InteractAnimated):
+    """Interactive with an animation from the frames in a single image.
+
+       The frames are frame_size, laid out left to right and then top to
+       bottom in the image. They are subsurfaces of it, so share its
+       pixels."""
+
+    # sheet_name - name of the image holding the frames
+    # frame_size - (width, height) of each frame
+    # frame_count - number of frames (defaults to all that fit)
+    # delay - number of frames to wait between changing images
+
+    def __init__(self, x, y, sheet_name, frame_size, delay,
+                 frame_count=None):
+        super(InteractSpriteSheet, self).__init__(x, y, [sheet_name], delay)
+        self._frame_size = frame_size
+        self._frame_count = frame_count
+
+    def _load_frames(self, thing):
+        sheet = thing.resource.get_image(thing.folder, self._names[0])
+        width, height = self._frame_size
+        columns = sheet.get_width() // width
+        frame_count = self._frame_count
+        if frame_count is None:
+            frame_count = columns * (sheet.get_height() // height)
+        assert 0 < frame_count <= columns * (sheet.get_height() // height), (
+            "%s doesn't hold %d frames" % (self._names[0], frame_count))
+        return [sheet.subsurface(Rect((i % columns) * width,
+                                      (i // columns) * height,
+                                      width, height))
+                for i in range(frame_count)]
+
+    def __repr__(self):
+        return '<InteractSpriteSheet: %s>' % self._names[0]
+
 
 class TakeableThing(Thing):
     "Thing that can be taken."
@@ -121,7 +121,8 @@ class Sound(object):
             self.sound_cache[path] = sound
         if sound is None:
             try:
-                sound = pygame_Sound(path)
+                sound = pygame_Sound(
+                    self._resource_finder.resource_source(path))
             except pygame.error:
                 print("Sound file not found: %s" % names)
                 sound = DummySound()
@@ -153,7 +154,7 @@ class Sound(object):
         if self._current_playlist:
             tune = self._current_playlist.get_next()
             if tune:
-                music.load(tune)
+                music.load(self._resource_finder.resource_source(tune))
                 music.play()
 
     def get_current_playlist(self):
@@ -4,13 +4,19 @@ from __future__ import division
 import os
 import json
 import copy
+import struct
+import zlib
 
 from collections import OrderedDict
 
+from pygame import Rect
 from pygame.color import Color
+from pygame.surface import Surface
 
 from .engine import ScreenEvent
-from .utils import draw_rect_image
+from .saving import StateJournal
+from .utils import (
+    draw_rect_image, convert_color, atomic_write, AnimationClock, LRUCache)
 from .widgets.text import LabelWidget
 
 
@@ -43,12 +49,35 @@ class Result(object):
             screen.end_game()
 
 
+# Header for compact saves: magic number and format version
+_COMPACT_HEADER = '>4sB'
+_COMPACT_MAGIC = b'PNCS'
+
+# Values we have to copy before handing out, in case they get changed
+_MUTABLE_TYPES = (dict, list)
+
+
 class GameState(object):
     """This holds the serializable game state.
 
        Games wanting to do fancier stuff with the state should
        sub-class this and feed the subclass into
-       GameDescription via the custom_data parameter."""
+       GameDescription via the custom_data parameter.
+
+       The state is copy-on-write: snapshots, exports and gizmos'
+       INITIAL_DATA share their contents with us, and we only copy an
+       entry the first time it may be changed. Sub-classes should go
+       through __getitem__ (or _own) rather than poking at _game_state
+       directly."""
+
+    # Format for new saves: 'compact' (zlib-compressed, with a versioned
+    # header) or 'json'. Saves in either format can be loaded.
+    SAVE_FORMAT = 'compact'
+    SAVE_EXTENSIONS = {
+        'compact': 'sav',
+        'json': 'json',
+        }
+    COMPACT_VERSION = 1
 
     def __init__(self, state_dict=None):
         if state_dict is None:
@@ -57,24 +86,134 @@ class GameState(object):
                 'item_factories': {},
                 'current_scene': None,
                 }
-        self._game_state = copy.deepcopy(state_dict)
+        # We share state_dict until we need to change it
+        self._game_state = state_dict
+        self._owns_top = False
+        # keys of the entries we have our own copies of
+        self._owned = set()
+        # map of state key -> the gizmo's INITIAL_DATA
+        self._initial = {}
+        # StateJournal recording our changes, if any
+        self.journal = None
+        # map of state key -> copy of the entry, for the entries get_data
+        # has handed out changeable values from since the last
+        # sync_journal
+        self._lent = {}
+
+    def _own_top(self):
+        if not self._owns_top:
+            self._game_state = dict(self._game_state)
+            self._owns_top = True
+
+    def _own(self, key):
+        """Return our own copy of a top-level entry, safe to change."""
+        if key not in self._owned:
+            self._own_top()
+            self._game_state[key] = copy.deepcopy(self._game_state[key])
+            self._owned.add(key)
+        return self._game_state[key]
+
+    def _share(self):
+        """Mark everything as shared, so we copy before changing it."""
+        self._owns_top = False
+        self._owned = set()
 
     def __getitem__(self, key):
-        return self._game_state[key]
+        value = self._game_state[key]
+        if isinstance(value, _MUTABLE_TYPES):
+            # The caller may change it
+            return self._own(key)
+        return value
 
     def __contains__(self, key):
         return key in self._game_state
 
     def export_data(self):
+        """Return a copy of the state as a dict."""
         return copy.deepcopy(self._game_state)
 
+    def shared_data(self):
+        """Return the state as a dict, for reading.
+
+        This shares its contents with us and with any snapshots, so is
+        cheap, but the result must not be modified. Use export_data for a
+        copy that can be.
+        """
+        self._share()
+        return self._game_state
+
+    def export_save_data(self):
+        """Return the state to save, leaving out the gizmo entries that
+        are unchanged from their INITIAL_DATA.
+
+        Those get filled back in by initialize_state when the game is
+        loaded, as for a new game.
+        """
+        data = self.shared_data()
+        initial = self._initial
+        data = dict(
+            (key, value) for key, value in data.items()
+            if key not in initial or (value is not initial[key]
+                                      and value != initial[key]))
+        if self.journal is not None:
+            data['_journal'] = self.journal.position()
+        return data
+
+    def snapshot(self):
+        """Return a copy of this state, sharing data copy-on-write."""
+        clone = copy.copy(self)
+        clone._initial = dict(self._initial)
+        clone.journal = None
+        clone._lent = {}
+        self._share()
+        clone._share()
+        return clone
+
+    def restore(self, snapshot):
+        """Go back to the state in a snapshot.
+
+        The snapshot is left unchanged, so it can be restored again.
+        """
+        self._game_state = snapshot._game_state
+        self._initial = dict(snapshot._initial)
+        self._lent = {}
+        self._share()
+        snapshot._share()
+
     def get_data(self, state_key, data_key):
-        """Get a single entry"""
-        return self[state_key].get(data_key, None)
+        """Get a single entry
+
+        Lists and dicts may be changed in place. When journalling, such
+        changes are only recorded by the next sync_journal(), which
+        GameScreen calls after every interaction; set_data records changes
+        straight away."""
+        value = self._game_state[state_key].get(data_key, None)
+        if isinstance(value, _MUTABLE_TYPES):
+            entry = self[state_key]
+            if self.journal is not None and state_key not in self._lent:
+                self._lent[state_key] = copy.deepcopy(entry)
+            return entry.get(data_key, None)
+        return value
+
+    def sync_journal(self):
+        """Journal any changes made in place to values from get_data."""
+        lent, self._lent = self._lent, {}
+        if self.journal is None:
+            return
+        for state_key in sorted(lent):
+            entry = self._game_state[state_key]
+            if entry != lent[state_key]:
+                self.journal.record('entry', state_key, entry)
 
     def set_data(self, state_key, data_key, value):
         """Set a single value"""
-        self[state_key][data_key] = value
+        entry = self[state_key]
+        entry[data_key] = value
+        if self.journal is not None:
+            self.journal.record('entry', state_key, entry)
+            if state_key in self._lent:
+                # Already recorded
+                self._lent[state_key] = copy.deepcopy(entry)
 
     def _initialize_state(self, state_dict, state_key, initial_data):
         if state_key not in self._game_state:
@@ -82,39 +221,130 @@ class GameState(object):
 
     def initialize_state(self, state_key, initial_data):
         """Initialize a gizmo entry"""
-        self._initialize_state(self._game_state, state_key, initial_data)
+        self._initial[state_key] = initial_data
+        if state_key not in self._game_state:
+            # Shared with the gizmo's INITIAL_DATA until it changes
+            self._own_top()
+            self._game_state[state_key] = initial_data
 
     def initialize_item_factory_state(self, state_key, initial_data):
         """Initialize an item factory entry"""
         self._initialize_state(
-            self._game_state['item_factories'], state_key, initial_data)
+            self['item_factories'], state_key, initial_data)
 
     def inventory(self, name='main'):
         return self['inventories'][name]
 
+    def inventory_changed(self, name='main'):
+        """Called after changing the contents of an inventory."""
+        if self.journal is not None:
+            self.journal.record('inventory', name, self.inventory(name))
+
     def set_current_scene(self, scene_name):
+        self._own_top()
         self._game_state['current_scene'] = scene_name
+        if self.journal is not None:
+            self.journal.record('scene', scene_name)
+
+    @classmethod
+    def get_save_fn(cls, save_dir, save_name, save_format=None):
+        if save_format is None:
+            save_format = cls.SAVE_FORMAT
+        return os.path.join(save_dir, '%s.%s' % (
+            save_name, cls.SAVE_EXTENSIONS[save_format]))
+
+    @classmethod
+    def find_save_fn(cls, save_dir, save_name):
+        """Find an existing save in any format, preferring SAVE_FORMAT.
+
+        Returns a (filename, format) tuple, or (None, None) if there is no
+        save.
+        """
+        formats = [cls.SAVE_FORMAT] + sorted(
+            f for f in cls.SAVE_EXTENSIONS if f != cls.SAVE_FORMAT)
+        for save_format in formats:
+            fn = cls.get_save_fn(save_dir, save_name, save_format)
+            if os.access(fn, os.R_OK):
+                return fn, save_format
+        return None, None
 
     @classmethod
-    def get_save_fn(cls, save_dir, save_name):
-        return os.path.join(save_dir, '%s.json' % (save_name,))
+    def has_save_game(cls, save_dir, save_name):
+        return cls.find_save_fn(save_dir, save_name)[0] is not None
 
     @classmethod
     def load_game(cls, save_dir, save_name):
-        fn = cls.get_save_fn(save_dir, save_name)
-        if os.access(fn, os.R_OK):
-            f = open(fn, 'r')
-            state = json.load(f)
+        fn, save_format = cls.find_save_fn(save_dir, save_name)
+        if fn is not None:
+            f = open(fn, 'rb')
+            raw = f.read()
             f.close()
-            return state
+            data = cls.decode_save_data(raw, save_format)
+            # Pick up any changes made after the save
+            return StateJournal.replay(data, save_dir, save_name)
+
+    @classmethod
+    def encode_save_data(cls, data, save_format=None):
+        if save_format is None:
+            save_format = cls.SAVE_FORMAT
+        raw = json.dumps(data, separators=(',', ':')).encode('utf-8')
+        if save_format == 'compact':
+            header = struct.pack(
+                _COMPACT_HEADER, _COMPACT_MAGIC, cls.COMPACT_VERSION)
+            raw = header + zlib.compress(raw, 9)
+        return raw
+
+    @classmethod
+    def decode_save_data(cls, raw, save_format):
+        if save_format == 'compact':
+            header_size = struct.calcsize(_COMPACT_HEADER)
+            magic, version = struct.unpack(
+                _COMPACT_HEADER, raw[:header_size])
+            if magic != _COMPACT_MAGIC:
+                raise ValueError("Not a save game")
+            if version > cls.COMPACT_VERSION:
+                raise ValueError("Unsupported save game version %d"
+                                 % (version,))
+            raw = zlib.decompress(raw[header_size:])
+        return json.loads(raw.decode('utf-8'))
 
     def save_game(self, save_dir, save_name):
-        fn = self.get_save_fn(save_dir, save_name)
+        self.write_save_data(save_dir, save_name, self.export_save_data())
+
+    @classmethod
+    def write_save_data(cls, save_dir, save_name, data):
+        """Write exported data to a save file.
+
+        The save file is replaced atomically, so neither a crash nor
+        another save in progress leaves a half-written save. This may be
+        called from the SaveWorker thread.
+        """
+        fn = cls.get_save_fn(save_dir, save_name)
         if not os.path.isdir(save_dir):
             os.makedirs(save_dir)
-        f = open(fn, 'w')
-        json.dump(self.export_data(), f)
-        f.close()
+        raw = cls.encode_save_data(data)
+        with atomic_write(fn) as f:
+            f.write(raw)
+
+
+class GameSnapshot(object):
+    """The state of a Game at some point, for Game.restore().
+
+    This holds a copy-on-write snapshot of the GameState and the things
+    in each scene and detail view, so the existing scene graph can be
+    rebound to it without calling load_scenes or setup() again.
+    """
+
+    def __init__(self, game):
+        self.data = game.data.snapshot()
+        self.tool = game.tool
+        self.current_inventory = game.current_inventory
+        self.scenes = dict(
+            (name, scene.export_things())
+            for name, scene in game.scenes.items())
+        self.detail_views = dict(
+            (name, detail_view.export_things())
+            for name, detail_view in game.detail_views.items())
 
 
 class Game(object):
@@ -142,6 +372,11 @@ class Game(object):
         self.data = game_state
         # debug rects
         self.debug_rects = False
+        # rendered hover descriptions, shared by all scenes
+        self.description_cache = LRUCache(gd.constants.description_cache_size)
+        # drives all the animations
+        self.animation_clock = AnimationClock(
+            gd.constants.animation_frame_rate)
 
     def get_current_scene(self):
         scene_name = self.data['current_scene']
@@ -167,6 +402,25 @@ class Game(object):
     def set_custom_data(self, data_object):
         self.data = data_object
 
+    def snapshot(self):
+        """Return a GameSnapshot of the current state."""
+        return GameSnapshot(self)
+
+    def restore(self, snapshot):
+        """Go back to the state in a GameSnapshot.
+
+        Only the GameState and which things are in which scenes are
+        restored, so gizmos must keep their state in the GameState, as
+        they must for saving anyway.
+        """
+        self.data.restore(snapshot.data)
+        self.tool = snapshot.tool
+        self.current_inventory = snapshot.current_inventory
+        for name, things in snapshot.scenes.items():
+            self.scenes[name].restore_things(things)
+        for name, things in snapshot.detail_views.items():
+            self.detail_views[name].restore_things(things)
+
     def set_debug_rects(self, value=True):
         self.debug_rects = value
 
@@ -206,6 +460,7 @@ class Game(object):
                          {'name': name, 'detail': True})
 
     def _update_inventory(self):
+        self.data.inventory_changed(self.current_inventory)
         ScreenEvent.post('game', 'inventory', None)
 
     def add_inventory_item(self, item_name):
@@ -300,6 +555,86 @@ class StatefulGizmo(GameDeveloperGizmo):
             return self.state.get_data(self.state_key, key)
 
 
+class ThingIndex(object):
+    """Uniform grid over the interact rects of a scene's things.
+
+    Each grid cell maps to the things with a rect overlapping it, so hit
+    testing only checks the things near the cursor. Things are checked in
+    the order they were added to the scene, as with Scene.things.
+    """
+
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        # map of (column, row) -> set of thing names
+        self._cells = {}
+        # map of thing name -> cells it is in
+        self._thing_cells = {}
+        # map of thing name -> (priority, thing)
+        self._things = {}
+        # names of things with their own contains() we have to ask
+        self._always_check = set()
+        self._next_priority = 0
+
+    def add(self, thing):
+        """Start tracking a thing, keeping its priority if replacing one."""
+        if thing.name in self._things:
+            priority = self._things[thing.name][0]
+        else:
+            priority = self._next_priority
+            self._next_priority += 1
+        self._things[thing.name] = (priority, thing)
+        self.update(thing)
+
+    def remove(self, thing):
+        self._clear_cells(thing.name)
+        self._always_check.discard(thing.name)
+        del self._things[thing.name]
+
+    def update(self, thing):
+        """Re-index a thing after its rect has changed."""
+        self._clear_cells(thing.name)
+        if type(thing).contains != Thing.contains:
+            self._always_check.add(thing.name)
+            return
+        self._always_check.discard(thing.name)
+        if thing.rect is None:
+            return
+        rects = thing.rect
+        if hasattr(rects, 'collidepoint'):
+            rects = [rects]
+        size = self.cell_size
+        cells = set()
+        for rect in rects:
+            if rect.width <= 0 or rect.height <= 0:
+                continue
+            for column in range(rect.left // size,
+                                (rect.right - 1) // size + 1):
+                for row in range(rect.top // size,
+                                 (rect.bottom - 1) // size + 1):
+                    cells.add((column, row))
+        for cell in cells:
+            self._cells.setdefault(cell, set()).add(thing.name)
+        self._thing_cells[thing.name] = cells
+
+    def _clear_cells(self, name):
+        for cell in self._thing_cells.pop(name, ()):
+            names = self._cells[cell]
+            names.discard(name)
+            if not names:
+                del self._cells[cell]
+
+    def find(self, pos):
+        """Return the highest priority thing containing pos, or None."""
+        cell = (pos[0] // self.cell_size, pos[1] // self.cell_size)
+        names = self._cells.get(cell, set()) | self._always_check
+        for _priority, thing in sorted(
+                (self._things[name] for name in names),
+                key=lambda entry: entry[0]):
+            if thing.contains(pos):
+                return thing
+        return None
+
+
 class Scene(StatefulGizmo):
     """Base class for scenes."""
 
@@ -315,6 +650,13 @@ class Scene(StatefulGizmo):
     # Offset of the background image
     OFFSET = (0, 0)
 
+    # Cell size of the grid used to find things under the cursor
+    HIT_GRID_SIZE = 32
+
+    # Keep the background and the static things drawn over it (those
+    # before the first animated thing) in a single cached image
+    CACHE_STATIC_LAYER = True
+
     def __init__(self, state):
         StatefulGizmo.__init__(self)
         # scene name
@@ -327,8 +669,20 @@ class Scene(StatefulGizmo):
         # since relying just on the order of objects is fragile and not
         # very flexible.
         self.things = OrderedDict()
+        self._thing_index = ThingIndex(self.HIT_GRID_SIZE)
         self.current_thing = None
         self._background = None
+        # the cached background and static things, the (size, debug
+        # rects) it was drawn for, and the things to draw over it
+        self._static_layer = None
+        self._static_layer_key = None
+        self._dynamic_things = None
+        # the image cache keys pinned while the scene is shown
+        self._pinned_images = None
+        # the things that need animating, and the areas (None for the
+        # whole scene) that changed when they were last animated
+        self._animated_things = None
+        self.changed_rects = []
 
     def add_item_factory(self, item_factory):
         self.game.add_item_factory(item_factory)
@@ -338,10 +692,14 @@ class Scene(StatefulGizmo):
         if not thing.should_add():
             return
         self.things[thing.name] = thing
+        self._thing_index.add(thing)
         thing.set_scene(self)
+        self._things_changed()
 
     def remove_thing(self, thing):
         del self.things[thing.name]
+        self._thing_index.remove(thing)
+        self._things_changed()
         if thing is self.current_thing:
             self.current_thing.leave()
             self.current_thing = None
@@ -351,10 +709,18 @@ class Scene(StatefulGizmo):
                 self.current_thing.get_description())
         if text is None:
             return None
-        label = LabelWidget((0, 10), self.gd, text)
-        label.do_prepare()
+        constants = self.gd.constants
+        key = (text, constants.font, constants.font_size,
+               tuple(convert_color(constants.text_color)),
+               tuple(convert_color(constants.label_bg_color)),
+               tuple(convert_color(constants.label_border_color)))
+        label = self.game.description_cache.get(key)
+        if label is None:
+            label = LabelWidget((0, 10), self.gd, text)
+            label.do_prepare()
+            self.game.description_cache[key] = label
         # TODO: Centre more cleanly
-        label.rect.left += (dest_rect.width - label.rect.width) // 2
+        label.rect.left = (dest_rect.width - label.rect.width) // 2
         return label
 
     def draw_description(self, surface):
@@ -379,8 +745,46 @@ class Scene(StatefulGizmo):
             thing.draw(surface)
 
     def draw(self, surface):
-        self.draw_background(surface)
-        self.draw_things(surface)
+        if not self._can_cache_static_layer():
+            self.draw_background(surface)
+            self.draw_things(surface)
+            return
+        self._update_static_layer(surface)
+        surface.blit(self._static_layer, (0, 0))
+        for thing in self._dynamic_things:
+            thing.draw(surface)
+
+    def _can_cache_static_layer(self):
+        cls = type(self)
+        return (self.CACHE_STATIC_LAYER
+                and cls.draw_background == Scene.draw_background
+                and cls.draw_things == Scene.draw_things)
+
+    def _things_changed(self):
+        self._animated_things = None
+        self.invalidate_static_layer()
+
+    def invalidate_static_layer(self):
+        """Redraw the cached background and static things next time."""
+        self._static_layer_key = None
+
+    def _update_static_layer(self, surface):
+        key = (surface.get_size(), self.game.debug_rects)
+        if key == self._static_layer_key:
+            return
+        if (self._static_layer is None
+                or self._static_layer.get_size() != key[0]):
+            self._static_layer = Surface(key[0], 0, surface)
+        # The background may not cover the whole layer
+        self._static_layer.fill((200, 200, 200))
+        self.draw_background(self._static_layer)
+        things = list(self.things.values())
+        static = 0
+        while static < len(things) and things[static].is_static():
+            things[static].draw(self._static_layer)
+            static += 1
+        self._dynamic_things = things[static:]
+        self._static_layer_key = key
 
     def interact(self, item, pos):
         """Interact with a particular position.
@@ -392,15 +796,40 @@ class Scene(StatefulGizmo):
         if self.current_thing is not None:
             return self.current_thing.interact(item)
 
-    def animate(self):
-        """Animate all the things in the scene.
+    def _get_animated_things(self):
+        if self._animated_things is None:
+            self._animated_things = [thing for thing in self.things.values()
+                                     if thing.is_animated()]
+        return self._animated_things
 
-           Return true if any of them need to queue a redraw"""
-        result = False
-        for thing in self.things.values():
-            if thing.animate():
-                result = True
-        return result
+    def is_animated(self):
+        """Whether any things in the scene need animating."""
+        return bool(self._get_animated_things())
+
+    def animation_delay(self):
+        """Return the time in seconds until animating may next change
+        something in the scene, or None if nothing will."""
+        delays = [thing.animation_delay()
+                  for thing in self._get_animated_things()]
+        delays = [delay for delay in delays if delay is not None]
+        return min(delays) if delays else None
+
+    def animate(self):
+        """Animate the animated things in the scene.
+
+           Return true if any of them need to queue a redraw, leaving the
+           areas to redraw in changed_rects (None for the whole scene)"""
+        changed_rects = []
+        # Animating may change the things in the scene
+        for thing in list(self._get_animated_things()):
+            if thing.animate() and changed_rects is not None:
+                rect = thing.get_draw_rect()
+                if rect is None:
+                    changed_rects = None
+                else:
+                    changed_rects.append(rect)
+        self.changed_rects = changed_rects
+        return changed_rects != []
 
     def enter(self):
         return None
@@ -408,16 +837,74 @@ class Scene(StatefulGizmo):
     def leave(self):
         return None
 
+    def get_image_names(self):
+        """The images the scene draws, as get_image name fragments."""
+        names = []
+        if self.BACKGROUND:
+            names.append((self.FOLDER, self.BACKGROUND))
+        for thing in self.things.values():
+            names.extend(thing.get_image_names())
+        return names
+
+    def preload_images(self, callback=None):
+        """Start decoding the scene's background in the background, so
+        entering it doesn't have to wait for it. The things' images are
+        already loaded, by set_interact in load_scenes."""
+        names = []
+        if self.BACKGROUND:
+            names.append((self.FOLDER, self.BACKGROUND))
+        self.resource.preload_images(names, callback)
+
+    def pin_images(self):
+        """Keep the scene's images in the image cache while it's shown."""
+        if self._pinned_images is None:
+            self._pinned_images = self.resource.pin_images(
+                self.get_image_names())
+
+    def release_images(self):
+        """Drop the scene's cached images while it isn't shown, so the
+        image cache can evict them."""
+        if self._pinned_images is not None:
+            self.resource.unpin_images(self._pinned_images)
+            self._pinned_images = None
+        self._background = None
+        self._static_layer = None
+        self.invalidate_static_layer()
+
+    def export_things(self):
+        """Return the things in the scene and their interacts."""
+        return tuple((thing, thing.current_interact, thing.rect)
+                     for thing in self.things.values())
+
+    def restore_things(self, things):
+        """Go back to the things returned by export_things."""
+        if things == self.export_things():
+            return
+        self.things = OrderedDict()
+        self._thing_index = ThingIndex(self.HIT_GRID_SIZE)
+        self.current_thing = None
+        self._things_changed()
+        for thing, interact, rect in things:
+            thing.current_interact = interact
+            thing.rect = rect
+            self.things[thing.name] = thing
+            self._thing_index.add(thing)
+
+    def update_thing_rect(self, thing):
+        """Called when a thing's interact (and so rect) changes."""
+        if self.things.get(thing.name) is thing:
+            self._thing_index.update(thing)
+            self._things_changed()
+
     def update_current_thing(self, pos):
         if self.current_thing is not None:
             if not self.current_thing.contains(pos):
                 self.current_thing.leave()
                 self.current_thing = None
-        for thing in self.things.values():
-            if thing.contains(pos):
-                thing.enter(self.game.tool)
-                self.current_thing = thing
-                break
+        thing = self._thing_index.find(pos)
+        if thing is not None:
+            thing.enter(self.game.tool)
+            self.current_thing = thing
 
     def mouse_move(self, pos):
         """Call to check whether the cursor has entered / exited a thing.
@@ -437,6 +924,39 @@ class Scene(StatefulGizmo):
         return super(Scene, self).set_state(state)
 
 
+# map of class -> {tool name: interact_with_<tool name> class attribute}
+_INTERACT_HANDLERS = {}
+_INTERACT_PREFIX = 'interact_with_'
+
+
+def _find_interact_handlers(cls):
+    handlers = {}
+    for klass in reversed(cls.__mro__):
+        for name, value in vars(klass).items():
+            if name.startswith(_INTERACT_PREFIX):
+                handlers[name[len(_INTERACT_PREFIX):]] = value
+    return dict((tool_name, value) for tool_name, value in handlers.items()
+                if value is not None)
+
+
+def get_interact_handler(obj, tool_name):
+    """Return obj's interact_with_<tool_name> method, or None.
+
+    The handlers are found once per class, so must be defined on the
+    class rather than set on instances.
+    """
+    cls = type(obj)
+    try:
+        handlers = _INTERACT_HANDLERS[cls]
+    except KeyError:
+        handlers = _INTERACT_HANDLERS[cls] = _find_interact_handlers(cls)
+    handler = handlers.get(tool_name)
+    if hasattr(handler, '__get__'):
+        # Bind it, as getattr would
+        return handler.__get__(obj, cls)
+    return handler
+
+
 class InteractiveMixin(object):
     def is_interactive(self, tool=None):
         return True
@@ -446,14 +966,13 @@ class InteractiveMixin(object):
             return None
         if tool is None:
             return self.interact_without()
-        handler = getattr(self, 'interact_with_' + tool.tool_name, None)
-        inverse_handler = self.get_inverse_interact(tool)
+        handler = get_interact_handler(self, tool.tool_name)
         if handler is not None:
             return handler(tool)
-        elif inverse_handler is not None:
+        inverse_handler = self.get_inverse_interact(tool)
+        if inverse_handler is not None:
             return inverse_handler(self)
-        else:
-            return self.interact_default(tool)
+        return self.interact_default(tool)
 
     def get_inverse_interact(self, tool):
         return None
@@ -530,11 +1049,18 @@ class Thing(StatefulGizmo, InteractiveMixin):
         self.rect = self.current_interact.interact_rect
         if self.scene:
             self._fix_rect()
+            self.scene.update_thing_rect(self)
         assert self.rect is not None, name
 
     def select_interact(self):
         return self.INITIAL
 
+    def get_image_names(self):
+        """The images used by the thing's interacts, as get_image name
+        fragments."""
+        return [(self.folder, name) for interact in self.interacts.values()
+                for name in interact.get_image_names()]
+
     def contains(self, pos):
         if hasattr(self.rect, 'collidepoint'):
             return self.rect.collidepoint(pos)
@@ -558,6 +1084,40 @@ class Thing(StatefulGizmo, InteractiveMixin):
     def animate(self):
         return self.current_interact.animate()
 
+    def is_animated(self):
+        """Whether the thing needs animate() calling."""
+        if type(self).animate != Thing.animate:
+            return True
+        # Interacts not based on scenewidgets.Interact may not say
+        is_animated = getattr(self.current_interact, 'is_animated', None)
+        return is_animated is None or is_animated()
+
+    def animation_delay(self):
+        """Return the time in seconds until animate() may next change the
+        thing, or None if it never will."""
+        if not self.is_animated():
+            return None
+        clock = self.game.animation_clock
+        delay = getattr(self.current_interact, 'animation_delay', None)
+        if type(self).animate != Thing.animate or delay is None:
+            # We can't tell, so check every animation frame
+            return clock.time_to_next_frame()
+        return delay(clock)
+
+    def is_static(self):
+        """Whether the thing looks the same until its interact changes."""
+        is_static = getattr(self.current_interact, 'is_static', None)
+        return (type(self).draw == Thing.draw and not self.is_animated()
+                and is_static is not None and is_static())
+
+    def get_draw_rect(self):
+        """The area of the scene the thing draws its interact in, or None
+        if we can't tell."""
+        rect = getattr(self.current_interact, 'rect', None)
+        if type(self).draw != Thing.draw or not isinstance(rect, Rect):
+            return None
+        return rect.move(self.scene.OFFSET)
+
     def draw(self, surface):
         old_rect = self.current_interact.rect
         if old_rect:
@@ -648,7 +1208,7 @@ class Item(GameDeveloperGizmo, InteractiveMixin):
         return self.inventory_image
 
     def get_inverse_interact(self, tool):
-        return getattr(tool, 'interact_with_' + self.tool_name, None)
+        return get_interact_handler(tool, self.tool_name)
 
     def is_interactive(self, tool=None):
         if tool:
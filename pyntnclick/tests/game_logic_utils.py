@@ -1,23 +1,68 @@
 import unittest
 
-import pygame.display
-import pygame.event
-
 from .. import resources
+from ..constants import GameConstants
+from ..engine import get_event_bus
+from ..utils import AnimationClock
+
+
+class FakeClock(object):
+    """A clock for AnimationClock and the savers, set by hand."""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class FakeGameDescription(object):
+    """Just enough of a GameDescription to build a Game in tests."""
+
+    constants = GameConstants()
+    resource = None
+    sound = None
+
+
+class FakeGame(object):
+    """Just enough of a Game for testing gizmos without loading scenes."""
+
+    def __init__(self, scenes=None, detail_views=None):
+        self.scenes = scenes or {}
+        self.detail_views = detail_views or {}
+        self.animation_clock = AnimationClock(25, clock=FakeClock())
 
 
 class GameLogicTestCase(unittest.TestCase):
     CURRENT_SCENE = None
     GAME_DESCRIPTION_CLASS = None
+    # If set, build the game once for the test case class and restore a
+    # snapshot of it for each test, rather than building it every time.
+    # This is much faster, but only works if gizmos keep all their state
+    # in the game state.
+    SHARE_GAME = False
+
+    # (game_description, game, snapshot) when SHARE_GAME is set
+    _shared_game = None
+
+    def _create_game(self):
+        cls = type(self)
+        if not self.SHARE_GAME:
+            game_description = self.GAME_DESCRIPTION_CLASS()
+            return game_description, game_description.initial_state()
+        if cls.__dict__.get('_shared_game') is None:
+            game_description = self.GAME_DESCRIPTION_CLASS()
+            game = game_description.initial_state()
+            cls._shared_game = (game_description, game, game.snapshot())
+        game_description, game, snapshot = cls._shared_game
+        game.restore(snapshot)
+        return game_description, game
 
     def setUp(self):
-        # Events require us to initialize the display
-        pygame.display.init()
         # Disable alpha conversion which requires a screen
         resources.Resources.CONVERT_ALPHA = False
 
-        self.game_description = self.GAME_DESCRIPTION_CLASS()
-        self.state = self.game_description.initial_state()
+        self.game_description, self.state = self._create_game()
         self.scene_stack = []
 
         # We aren't handling events, monkey patch change_scene and show_detail
@@ -37,9 +82,9 @@ class GameLogicTestCase(unittest.TestCase):
         self.assertTrue(len(self.scene_stack) > 0)
 
     def clear_event_queue(self):
-        # Since we aren't handling events, we may overflow the pygame
-        # event buffer if we're generating a lot of events
-        pygame.event.clear()
+        # Since we aren't handling events, throw away the ones the game
+        # posts so they don't pile up
+        get_event_bus().clear()
 
     def clear_inventory(self):
         # Remove all items from the inventory, ensuring tool is set to None
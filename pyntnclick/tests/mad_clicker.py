@@ -1,4 +1,32 @@
+from __future__ import division
+
+import traceback
+from timeit import default_timer
+
 from .game_logic_utils import GameLogicTestCase
+from ..engine import get_event_bus
+from ..scenewidgets import TakeableThing
+from ..tools.explorer import StateExplorer
+from ..tools.pool import GamePool
+
+
+def check_result_obj(obj):
+    """Check that the obj is the sort of result obj/seq we expect"""
+    if obj is None:
+        return True
+    if hasattr(obj, 'process'):
+        return True
+    return False
+
+
+def check_result(obj):
+    """Check that the obj is the sort of result obj/seq we expect"""
+    # We do it this way, because we don't allow seqs to contain seqs
+    if not check_result_obj(obj):
+        for subobj in obj:
+            if not check_result_obj(subobj):
+                return False
+    return True
 
 
 class MadClickerTestCase(GameLogicTestCase):
@@ -6,20 +34,11 @@ class MadClickerTestCase(GameLogicTestCase):
 
     def check_result_obj(self, obj):
         """Check that the obj is the sort of result obj/seq we expect"""
-        if obj is None:
-            return True
-        if hasattr(obj, 'process'):
-            return True
-        return False
+        return check_result_obj(obj)
 
     def check_result(self, obj):
         """Check that the obj is the sort of result obj/seq we expect"""
-        # We do it this way, because we don't allow seqs to contain seqs
-        if not self.check_result_obj(obj):
-            for subobj in obj:
-                if not self.check_result_obj(subobj):
-                    return False
-        return True
+        return check_result(obj)
 
     def _format_item(self, item):
         return "%s (%s)" % (item.name, item)
@@ -111,3 +130,176 @@ class MadClickerTestCase(GameLogicTestCase):
             self.do_item(item, None)
             for item2 in self.state.inventory():
                 self.do_item(item, item2)
+
+    def do_parallel_mad_clicker(self, processes=None):
+        """Mad clicker, split across processes, with every item"""
+        report = MadClickerRunner(self.GAME_DESCRIPTION_CLASS,
+                                  processes).run()
+        self.assertEqual([], report.failures, report.format())
+
+    def do_explore(self, processes=None, max_states=None):
+        """Try every reachable game state, checking the game can be
+           completed without errors"""
+        report = StateExplorer(self.GAME_DESCRIPTION_CLASS, processes,
+                               max_states).run()
+        self.assertEqual([], report.errors, report.format())
+        if not report.truncated:
+            self.assertTrue(report.completable, report.format())
+
+
+class MadClickerShard(object):
+    """Mad clicks the things in one scene or detail view, or the items.
+
+    Each interaction starts from a snapshot of the initial game, holding
+    the items involved. Things are tried in each of their interacts with
+    no item and with every kind of item, except the item a
+    TakeableThing gives, which can't be held while it's still there to
+    take. Items are tried with no item and with every other kind of
+    item."""
+
+    def __init__(self, gd):
+        self.gd = gd
+        self.game = gd.initial_state()
+        # names of the item factories
+        self.items = sorted(self.game.item_factories)
+        self.snapshot = self.game.snapshot()
+        # map of kinds of item held -> (GameSnapshot, item names)
+        self._inventory_snapshots = {}
+        get_event_bus().clear()
+
+    def shards(self):
+        """List the shards of work, for run()."""
+        return ([('scene', name) for name in sorted(self.game.scenes)] +
+                [('detail', name) for name in sorted(self.game.detail_views)]
+                + [('items', None)])
+
+    def _get_item(self, base_name):
+        """Return an item of a kind, creating one if the game hasn't."""
+        factory = self.game.item_factories[base_name]
+        created = factory.get_data('created')
+        if created:
+            return factory.get_item(created[0])
+        return factory.create_item()
+
+    def _reset(self, inventory):
+        """Restore the initial game, holding the given kinds of item."""
+        key = tuple(inventory)
+        if key not in self._inventory_snapshots:
+            self.game.restore(self.snapshot)
+            names = [self._get_item(base_name).name
+                     for base_name in inventory]
+            self.game.inventory()[:] = names
+            self._inventory_snapshots[key] = (self.game.snapshot(), names)
+        snapshot, names = self._inventory_snapshots[key]
+        self.game.restore(snapshot)
+        return dict((base_name, self.game.get_item(name))
+                    for base_name, name in zip(inventory, names))
+
+    def _interactions(self, kind, name):
+        """List the (target, interact, tool) interactions in a shard."""
+        tools = [None] + self.items
+        if kind == 'items':
+            return [(item_name, None, tool_name)
+                    for item_name in self.items for tool_name in tools
+                    if tool_name != item_name]
+        if kind == 'scene':
+            things = self.game.scenes[name].things
+        else:
+            things = self.game.detail_views[name].things
+        return [(thing_name, interact_name, tool_name)
+                for thing_name, thing in things.items()
+                for interact_name in sorted(thing.interacts)
+                for tool_name in tools
+                if not (isinstance(thing, TakeableThing)
+                        and tool_name == thing.ITEM)]
+
+    def _get_target(self, kind, name, target_name, interact_name, items):
+        if kind == 'items':
+            return items[target_name]
+        if kind == 'scene':
+            self.game.data.set_current_scene(name)
+            thing = self.game.scenes[name].things[target_name]
+        else:
+            thing = self.game.detail_views[name].things[target_name]
+        thing._set_interact(interact_name)
+        return thing
+
+    def run(self, shard):
+        """Return the (description, error) failures and (description,
+        seconds) timings for the interactions in a shard."""
+        kind, name = shard
+        failures = []
+        timings = []
+        for (target_name, interact_name,
+                tool_name) in self._interactions(kind, name):
+            desc = '%s%s with %s' % (
+                target_name, interact_name and ':' + interact_name or '',
+                tool_name)
+            if name is not None:
+                desc = '%s: %s' % (name, desc)
+            try:
+                inventory = [tool_name] if tool_name is not None else []
+                if kind == 'items':
+                    inventory.append(target_name)
+                items = self._reset(inventory)
+                target = self._get_target(
+                    kind, name, target_name, interact_name, items)
+                tool = items.get(tool_name)
+                start = default_timer()
+                result = target.interact(tool)
+                timings.append((desc, default_timer() - start))
+                if not check_result(result):
+                    failures.append((desc, 'Unexpected result %r' % (
+                        result,)))
+            except Exception:
+                failures.append((desc, traceback.format_exc()))
+            get_event_bus().clear()
+        self.game.restore(self.snapshot)
+        return failures, timings
+
+
+class MadClickerReport(object):
+    """Failures and timings from MadClickerRunner."""
+
+    def __init__(self, failures, timings):
+        # list of (interaction, error)
+        self.failures = failures
+        # list of (interaction, seconds), slowest first
+        self.timings = sorted(timings, key=lambda t: t[1], reverse=True)
+
+    def format(self, slowest=10):
+        lines = ['%d interactions, %d failures' % (
+            len(self.timings), len(self.failures))]
+        for desc, error in self.failures:
+            lines.append('Failed: %s' % (desc,))
+            lines.append(error)
+        if self.timings:
+            lines.append('Slowest interactions:')
+            lines.extend('%8.2f ms  %s' % (seconds * 1000, desc)
+                         for desc, seconds in self.timings[:slowest])
+        return '\n'.join(lines)
+
+
+class MadClickerRunner(object):
+    """Run the mad clicker with every item, splitting the work per scene
+    and detail view across a pool of processes.
+
+    gd_class is the GameDescription class, which must be importable."""
+
+    def __init__(self, gd_class, processes=None):
+        self.gd_class = gd_class
+        self.processes = processes
+
+    def run(self):
+        pool = GamePool(MadClickerShard, self.gd_class, self.processes)
+        try:
+            shards = pool.worker.shards()
+            results = list(pool.imap('run', [(shard,) for shard in shards]))
+        finally:
+            pool.close()
+        failures = []
+        timings = []
+        for shard_failures, shard_timings in results:
+            failures.extend(shard_failures)
+            timings.extend(shard_timings)
+        return MadClickerReport(failures, timings)
@@ -0,0 +1,97 @@
+import os
+import shutil
+import sys
+import tempfile
+from unittest import TestCase
+
+from pygame.surface import Surface
+
+from ..assetpack import AssetPack, AssetPackError, build_pack, PACK_NAME
+from ..resources import Resources
+
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
+
+
+def write_file(root, name, data):
+    path = os.path.join(root, *name.split('/'))
+    if not os.path.isdir(os.path.dirname(path)):
+        os.makedirs(os.path.dirname(path))
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+class AssetPackTestCase(TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        for name in ['__init__.py', 'images/a.txt', 'en/images/a.txt',
+                     'locale/en/x.mo']:
+            write_file(self.root, name, name.encode('utf-8'))
+        self.pack_fn = os.path.join(self.root, PACK_NAME)
+        self.names = build_pack(self.root, self.pack_fn, ['locale'])
+        self.pack = AssetPack(self.pack_fn)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_names(self):
+        self.assertEqual(['en/images/a.txt', 'images/a.txt'], self.names)
+        self.assertEqual(self.names, sorted(self.pack.names()))
+        self.assertFalse('__init__.py' in self.pack)
+
+    def test_read(self):
+        self.assertEqual(b'images/a.txt',
+                         self.pack.get_buffer('images/a.txt').tobytes())
+        f = self.pack.open('en/images/a.txt')
+        self.assertEqual(b'en/', f.read(3))
+        f.seek(-5, os.SEEK_END)
+        self.assertEqual(b'a.txt', f.read())
+        self.assertEqual(b'', f.read())
+
+    def test_not_a_pack(self):
+        write_file(self.root, 'bad.pack', b'x' * 20)
+        self.assertRaises(AssetPackError, AssetPack,
+                          os.path.join(self.root, 'bad.pack'))
+
+
+class PackedResourcesTestCase(TestCase):
+    MODULE = 'pyntnclick_packed_resources'
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        root = os.path.join(self.path, self.MODULE)
+        write_file(root, '__init__.py', b'')
+        with open(os.path.join(DATA_PATH, 'images', 'pyntnclick',
+                               'hand.png'), 'rb') as f:
+            write_file(root, 'en/images/packed.png', f.read())
+        build_pack(root, os.path.join(root, PACK_NAME))
+        shutil.rmtree(os.path.join(root, 'en'))
+        sys.path.insert(0, self.path)
+        self.res = Resources(self.MODULE, 'en')
+        self.res.CONVERT_ALPHA = False
+
+    def tearDown(self):
+        sys.path.remove(self.path)
+        sys.modules.pop(self.MODULE, None)
+        shutil.rmtree(self.path)
+
+    def test_get_image(self):
+        image = self.res.get_image('packed.png')
+        self.assertTrue(isinstance(image, Surface))
+        self.assertEqual(
+            os.path.join(self.path, self.MODULE, 'en', 'images'),
+            os.path.normpath(self.res.get_resource_path('images')))
+
+    def test_stale_pack(self):
+        root = os.path.join(self.path, self.MODULE)
+        path = os.path.join(root, 'en', 'images', 'packed.png')
+        with open(os.path.join(DATA_PATH, 'images', 'pyntnclick',
+                               'end.png'), 'rb') as f:
+            write_file(root, 'en/images/packed.png', f.read())
+        mtime = os.path.getmtime(os.path.join(root, PACK_NAME)) + 10
+        os.utime(path, (mtime, mtime))
+        res = Resources(self.MODULE, 'en')
+        res.CONVERT_ALPHA = False
+        # The newer file is loaded rather than the packed one
+        self.assertEqual(path, res.resource_source(path))
+        self.assertEqual((800, 600), res.get_image('packed.png').get_size())
@@ -0,0 +1,278 @@
+import shutil
+import tempfile
+from unittest import TestCase
+
+import pygame.event
+from pygame import Rect, Surface
+from pygame.locals import NOEVENT, QUIT
+
+from ..constants import GameConstants
+from ..engine import (UserEvent, MUSIC_ENDED, EventBus, Screen, ScreenEvent,
+                      merge_rects, set_event_bus, wait_event)
+from ..gamescreen import GameScreen
+from ..main import GameDescription
+from ..menuscreen import MenuScreen
+from ..saving import StateJournal
+from ..state import GameState
+from .game_logic_utils import FakeGameDescription
+
+
+class PingEvent(UserEvent):
+    TYPE = "TEST_PING"
+
+
+class PongEvent(UserEvent):
+    TYPE = "TEST_PONG"
+
+
+class LoudPingEvent(PingEvent):
+    pass
+
+
+class UserEventTestCase(TestCase):
+    def test_distinct_types(self):
+        types = set([PingEvent.event_type(), PongEvent.event_type(),
+                     MUSIC_ENDED])
+        self.assertEqual(3, len(types))
+
+    def test_same_type_string(self):
+        self.assertEqual(PingEvent.event_type(), LoudPingEvent.event_type())
+
+    def test_matches(self):
+        ev = pygame.event.Event(PingEvent.event_type(), utype=PingEvent.TYPE)
+        self.assertTrue(PingEvent.matches(ev))
+        self.assertFalse(PongEvent.matches(ev))
+
+
+class EventBusTestCase(TestCase):
+    def setUp(self):
+        self.bus = EventBus()
+        self.old_bus = set_event_bus(self.bus)
+
+    def tearDown(self):
+        set_event_bus(self.old_bus)
+
+    def test_post_and_drain(self):
+        PingEvent.post(count=1)
+        PongEvent.post(count=2)
+        self.assertEqual(2, len(self.bus))
+        events = self.bus.drain()
+        self.assertEqual(0, len(self.bus))
+        self.assertTrue(PingEvent.matches(events[0]))
+        self.assertEqual(2, events[1].count)
+
+    def test_clear(self):
+        PingEvent.post()
+        self.bus.clear()
+        self.assertEqual([], self.bus.drain())
+
+
+class StripedScreen(Screen):
+    """Draws stripes, in a colour we can change without marking anything
+    dirty."""
+
+    def setup(self):
+        self.colour = (255, 0, 0)
+
+    def draw_background(self):
+        self.surface.fill((0, 0, 0))
+        for x in range(0, self.surface_size[0], 20):
+            self.surface.fill(self.colour, (x, 0, 10, self.surface_size[1]))
+
+
+class DrawDirtyTestCase(TestCase):
+    def setUp(self):
+        gd = FakeGameDescription()
+        gd.constants = GameConstants()
+        gd.constants.screen = (200, 100)
+        gd.constants.dirty_rects = True
+        self.screen = StripedScreen(gd)
+        self.screen.on_enter()
+        self.display = Surface((200, 100))
+        self.screen.draw_dirty(self.display)
+
+    def test_matches_draw(self):
+        self.screen.colour = (0, 255, 0)
+        self.screen.mark_dirty(Rect(5, 5, 20, 20))
+        self.screen.mark_dirty(Rect(150, 60, 30, 30))
+        self.assertEqual([Rect(5, 5, 20, 20), Rect(150, 60, 30, 30)],
+                         self.screen.draw_dirty(self.display))
+        expected = Surface((200, 100))
+        self.screen.draw(expected)
+        for pos in [(5, 5), (24, 24), (160, 60), (179, 89)]:
+            self.assertEqual(expected.get_at(pos), self.display.get_at(pos))
+        # Between the dirty regions is left alone
+        self.assertEqual((255, 0, 0, 255), self.display.get_at((100, 50)))
+
+    def test_full_redraw(self):
+        self.screen.colour = (0, 255, 0)
+        self.screen.mark_dirty(Rect(0, 0, 150, 100))
+        self.assertEqual([Rect(0, 0, 200, 100)],
+                         self.screen.draw_dirty(self.display))
+        self.assertEqual((0, 255, 0, 255), self.display.get_at((180, 50)))
+
+    def test_merge_rects(self):
+        self.assertEqual(
+            [Rect(50, 50, 5, 5), Rect(0, 0, 20, 20)],
+            merge_rects([Rect(0, 0, 10, 10), Rect(50, 50, 5, 5),
+                         Rect(15, 15, 5, 5), Rect(5, 5, 12, 12)]))
+
+
+class ProbeScreen(Screen):
+    def setup(self):
+        self.events = []
+        self.frames = 0
+        self.draws = 0
+
+    def draw(self, surface):
+        self.draws += 1
+        super(ProbeScreen, self).draw(surface)
+
+    def process_event(self, event_name, data):
+        self.events.append((event_name, data))
+
+    def animate(self):
+        self.frames += 1
+        return False
+
+
+class ProbeGame(GameDescription):
+    INITIAL_SCENE = 'room'
+    SCENE_LIST = ['room']
+    RESOURCE_MODULE = 'pyntnclick.tests'
+    SCREENS = {'probe': ProbeScreen}
+    START_SCREEN = 'probe'
+
+    def __init__(self):
+        super(ProbeGame, self).__init__()
+        # The game screen needs a real game's resources
+        del self._screens['game']
+
+
+class HeadlessEngineTestCase(TestCase):
+    def setUp(self):
+        self.bus = EventBus()
+        self.old_bus = set_event_bus(self.bus)
+        self.gd = ProbeGame()
+
+    def tearDown(self):
+        set_event_bus(self.old_bus)
+
+    def test_frames(self):
+        engine = self.gd.headless_engine()
+        self.assertEqual(3, engine.run(3))
+        self.assertEqual(5, engine.run(2))
+        self.assertEqual(5, engine.screens['probe'].frames)
+
+    def test_quit(self):
+        engine = self.gd.headless_engine(
+            [[], [], [pygame.event.Event(QUIT)], []])
+        self.assertEqual(2, engine.run(10))
+
+    def test_bus_events(self):
+        engine = self.gd.headless_engine()
+        ScreenEvent.post('probe', 'ping', 1)
+        engine.run(1)
+        self.assertEqual([('ping', 1)], engine.screens['probe'].events)
+        self.assertEqual(0, len(self.bus))
+
+    def test_idle_frames_not_drawn(self):
+        engine = self.gd.headless_engine(
+            [[], [], [], [self.click()], [], []])
+        engine.run(6)
+        # Idle frames are drawn once, then not until something happens
+        self.assertEqual(3, engine.screens['probe'].draws)
+
+    def click(self):
+        return pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(1, 1),
+                                  button=1)
+
+    def test_wait_without_timeout(self):
+        self.gd.headless_engine()
+        pygame.event.clear()
+        real_wait = pygame.event.wait
+
+        def wait():
+            # Like pygame before 2.0
+            return real_wait()
+        pygame.event.wait = wait
+        try:
+            self.assertEqual(NOEVENT, wait_event(20).type)
+        finally:
+            pygame.event.wait = real_wait
+
+
+class ImageMenuScreen(MenuScreen):
+    """The menu, with image buttons, as there are no fonts to test with."""
+
+    def make_text_button(self, pos, text):
+        return self.make_image_button(pos, 'pyntnclick/hand.png')
+
+    def make_resume_game_button(self):
+        return self.make_resume_button()
+
+
+class ReplayGameScreen(GameScreen):
+    """Records the states the game is reset to, as there are no scenes or
+    game resources to set up a real game with."""
+
+    def setup(self):
+        self.loaded = []
+
+    def reset_game(self, game_state=None):
+        self.loaded.append(game_state)
+
+    def animate(self):
+        return False
+
+    def draw(self, surface):
+        pass
+
+
+class MenuGame(ProbeGame):
+    SCREENS = {'menu': ImageMenuScreen}
+    START_SCREEN = 'menu'
+
+    def __init__(self, save_dir):
+        super(MenuGame, self).__init__()
+        self._screens['game'] = ReplayGameScreen
+        self.save_dir = save_dir
+
+    def get_default_save_location(self):
+        return self.save_dir
+
+
+class LoadAutosaveTestCase(TestCase):
+    def setUp(self):
+        self.bus = EventBus()
+        self.old_bus = set_event_bus(self.bus)
+        self.save_dir = tempfile.mkdtemp()
+        self.gd = MenuGame(self.save_dir)
+
+    def tearDown(self):
+        set_event_bus(self.old_bus)
+        shutil.rmtree(self.save_dir)
+
+    def click(self, pos):
+        return pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=pos, button=1)
+
+    def test_no_autosave(self):
+        engine = self.gd.headless_engine()
+        menu = engine.screens['menu']
+        self.assertFalse(menu._load_autosave_button.visible)
+
+    def test_load_autosave(self):
+        # A game that stopped with changes since its last save
+        state = GameState()
+        journal = StateJournal(state, self.gd.save_worker, self.save_dir,
+                               GameScreen.AUTOSAVE_NAME, 10)
+        state.set_current_scene('hall')
+        self.gd.save_worker.flush()
+        state.inventory().append('key')
+        state.inventory_changed()
+        journal.close()
+        engine = self.gd.headless_engine([[self.click((210, 170))], []])
+        engine.run(2)
+        [loaded] = engine.screens['game'].loaded
+        self.assertEqual('hall', loaded['current_scene'])
+        self.assertEqual(['key'], loaded['inventories']['main'])
@@ -0,0 +1,122 @@
+from unittest import TestCase
+
+from ..scenewidgets import InteractNoImage
+from ..state import Game, GameState, Item, Scene, Thing
+from ..tools.explorer import (
+    ExplorationReport, GameExplorer, StateExplorer, state_key)
+from .game_logic_utils import FakeGameDescription
+
+
+class StateKeyTestCase(TestCase):
+    def test_canonical(self):
+        text, key = state_key({'b': 1, 'a': [2]}, ['box'])
+        self.assertEqual('[{"a":[2],"b":1},["box"]]', text)
+        self.assertEqual(key, state_key({'a': [2], 'b': 1}, ['box'])[1])
+        self.assertNotEqual(key, state_key({'a': [2], 'b': 1}, [])[1])
+
+
+class Torch(Item):
+    NAME = 'torch'
+
+
+class Match(Item):
+    NAME = 'match'
+
+
+class Door(Thing):
+    NAME = 'door'
+    INTERACTS = {'door': InteractNoImage(0, 0, 10, 10)}
+    INITIAL = 'door'
+
+    def interact_without(self):
+        self.game.change_scene('cellar')
+
+
+class Hall(Scene):
+    NAME = 'hall'
+    INITIAL_DATA = {'left': False}
+
+    def setup(self):
+        self.add_item_factory(Torch)
+        self.add_item_factory(Match)
+        self.game.add_inventory_item('torch')
+        self.game.add_inventory_item('match')
+        self.add_thing(Door())
+
+    def leave(self):
+        self.set_data('left', True)
+
+
+class Cellar(Scene):
+    NAME = 'cellar'
+
+
+class HallGameDescription(FakeGameDescription):
+    def initial_state(self):
+        game = Game(self, GameState())
+        game.add_scene(Hall(game))
+        game.add_scene(Cellar(game))
+        game.data.set_current_scene('hall')
+        return game
+
+
+class GameExplorerTestCase(TestCase):
+    def setUp(self):
+        self.explorer = GameExplorer(HallGameDescription())
+        self.game = self.explorer._get_game()
+
+    def test_actions(self):
+        self.assertEqual([
+            ('thing', 'door', None),
+            ('thing', 'door', 'torch:'),
+            ('thing', 'door', 'match:'),
+            ('item', 'torch:', 'match:'),
+            ('item', 'match:', 'torch:'),
+            ], self.explorer.actions(self.game))
+
+    def test_change_scene_leaves(self):
+        self.explorer.perform(self.game, ('thing', 'door', None))
+        self.assertEqual('cellar', self.game.data['current_scene'])
+        self.assertEqual(True, self.game.scenes['hall'].get_data('left'))
+
+
+class StateExplorerTestCase(TestCase):
+    def test_run(self):
+        report = StateExplorer(HallGameDescription, processes=1).run()
+        # The hall and the cellar
+        self.assertEqual(2, len(report.parents))
+        self.assertFalse(report.completable)
+        self.assertEqual([], report.errors)
+
+
+class ExplorationReportTestCase(TestCase):
+    def setUp(self):
+        # start -> hall -> (end), start -> pit
+        self.report = ExplorationReport()
+        report = self.report
+        report.parents['start'] = None
+        report.parents['hall'] = ('start', ('thing', 'door', 'key:'))
+        report.parents['pit'] = ('start', ('thing', 'pit', None))
+        report.edges = {'start': set(['hall', 'pit']), 'hall': set(),
+                        'pit': set(['pit'])}
+        report.endings['hall'] = ('thing', 'exit', None)
+
+    def test_walkthrough(self):
+        self.assertTrue(self.report.completable)
+        self.assertEqual([('thing', 'door', 'key:')],
+                         self.report.walkthrough('hall'))
+
+    def test_dead_ends(self):
+        self.assertEqual(set(['pit']), self.report.dead_ends())
+        self.report.truncated = True
+        self.assertEqual(set(), self.report.dead_ends())
+
+    def test_format(self):
+        self.assertEqual('\n'.join([
+            'Explored 3 states',
+            'Shortest walkthrough:',
+            '  thing door with key:',
+            '  thing exit',
+            '1 dead end states, such as after:',
+            '  thing pit',
+            ]), self.report.format())
@@ -0,0 +1,73 @@
+from unittest import TestCase
+
+from ..state import Game, GameState, Item, Result, Scene
+from .game_logic_utils import FakeGameDescription
+from .mad_clicker import MadClickerReport, MadClickerShard, check_result
+
+
+class CheckResultTestCase(TestCase):
+    def test_check_result(self):
+        self.assertTrue(check_result(None))
+        self.assertTrue(check_result(Result()))
+        self.assertTrue(check_result([Result(), None]))
+        self.assertFalse(check_result(['bad']))
+        self.assertFalse(check_result([[Result()]]))
+
+
+class MadClickerReportTestCase(TestCase):
+    def test_format(self):
+        report = MadClickerReport(
+            [('room: door with key', 'Unexpected result')],
+            [('room: door with None', 0.001),
+             ('room: door with key', 0.0125),
+             ('room: lamp with None', 0.002)])
+        self.assertEqual('\n'.join([
+            '3 interactions, 1 failures',
+            'Failed: room: door with key',
+            'Unexpected result',
+            'Slowest interactions:',
+            '   12.50 ms  room: door with key',
+            '    2.00 ms  room: lamp with None',
+            ]), report.format(slowest=2))
+
+
+class Torch(Item):
+    NAME = 'torch'
+
+
+class Match(Item):
+    NAME = 'match'
+
+
+class Cellar(Scene):
+    NAME = 'cellar'
+
+    def setup(self):
+        self.add_item_factory(Torch)
+        self.add_item_factory(Match)
+        self.game.add_inventory_item('torch')
+
+
+class CellarGameDescription(FakeGameDescription):
+    def initial_state(self):
+        game = Game(self, GameState())
+        game.add_scene(Cellar(game))
+        game.data.set_current_scene('cellar')
+        return game
+
+
+class MadClickerShardTestCase(TestCase):
+    def setUp(self):
+        self.shard = MadClickerShard(CellarGameDescription())
+
+    def test_reset(self):
+        items = self.shard._reset(['torch', 'match'])
+        self.assertEqual(['torch:', 'match:'],
+                         [items['torch'].name, items['match'].name])
+        self.assertEqual(['torch:', 'match:'], self.shard.game.inventory())
+        items = self.shard._reset(['torch'])
+        self.assertEqual(['torch:'], self.shard.game.inventory())
+        self.assertEqual(['torch:'], self.shard.game.item_factories[
+            'torch'].get_data('created'))
+        self.assertEqual([], self.shard.game.item_factories[
+            'match'].get_data('created'))
@@ -0,0 +1,32 @@
+from unittest import TestCase
+
+from ..metrics import FrameMetrics
+
+
+class FrameMetricsTestCase(TestCase):
+    def setUp(self):
+        self.metrics = FrameMetrics(10)
+
+    def test_empty(self):
+        self.assertEqual(None, self.metrics.percentile('draw', 50))
+
+    def test_percentile(self):
+        for i in range(1, 6):
+            self.metrics.record('draw', i)
+        self.assertEqual(1, self.metrics.percentile('draw', 0))
+        self.assertEqual(3, self.metrics.percentile('draw', 50))
+        self.assertEqual(5, self.metrics.percentile('draw', 100))
+        self.metrics.record('draw', 6)
+        self.assertEqual(3, self.metrics.percentile('draw', 50))
+        self.assertEqual(6, self.metrics.percentile('draw', 90))
+
+    def test_ring_buffer(self):
+        for i in range(25):
+            self.metrics.record('frame', i)
+        self.assertEqual(list(range(15, 25)), self.metrics.samples('frame'))
+
+    def test_summary(self):
+        self.metrics.record('flip', 2)
+        summary = self.metrics.summary((50, 99))
+        self.assertEqual([2, 2], summary['flip'])
+        self.assertEqual([None, None], summary['events'])
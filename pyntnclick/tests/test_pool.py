@@ -0,0 +1,33 @@
+import os
+from unittest import TestCase
+
+from ..tools.pool import GamePool
+from .game_logic_utils import FakeGameDescription
+
+
+class PidWorker(object):
+    def __init__(self, gd):
+        self.gd = gd
+
+    def add(self, a, b):
+        return a + b, os.getpid()
+
+
+class GamePoolTestCase(TestCase):
+    def test_one_process(self):
+        pool = GamePool(PidWorker, FakeGameDescription, 1)
+        try:
+            self.assertTrue(isinstance(pool.worker.gd, FakeGameDescription))
+            self.assertEqual([(3, os.getpid()), (7, os.getpid())],
+                             list(pool.imap('add', [(1, 2), (3, 4)])))
+        finally:
+            pool.close()
+
+    def test_processes(self):
+        pool = GamePool(PidWorker, FakeGameDescription, 2)
+        try:
+            results = list(pool.imap('add', [(1, 2), (3, 4)]))
+        finally:
+            pool.close()
+        self.assertEqual([3, 7], [total for total, pid in results])
+        self.assertFalse(os.getpid() in [pid for total, pid in results])
@@ -0,0 +1,79 @@
+import sys
+from unittest import TestCase
+
+from .. import prefetch
+from ..prefetch import find_scene_targets, get_class_targets, ScenePredictor
+from ..state import Result
+from .game_logic_utils import FakeGame
+
+
+class Door(object):
+    def interact_without(self):
+        self.game.change_scene('hall')
+
+    def interact_with_key(self, item):
+        return Result('Unlocked', detail_view='lock')
+
+
+class Room(object):
+    def __init__(self, name, things=()):
+        self.name = name
+        self.things = dict((type(thing).__name__, thing) for thing in things)
+
+
+class FindSceneTargetsTestCase(TestCase):
+    def test_targets(self):
+        self.assertEqual(
+            set([('a', False), ('b', True), ('c', True), ('d', True)]),
+            find_scene_targets(
+                "game.change_scene('a')\n"
+                "self.game.show_detail('b')\n"
+                "Result(detail_view='c')\n"
+                "Result('msg', None, 'd')\n"
+                "game.change_scene(name)\n"
+                "Result('msg')\n"))
+
+    def test_class_targets(self):
+        self.assertEqual(set([('hall', False), ('lock', True)]),
+                         get_class_targets(Door))
+
+    def test_frozen(self):
+        class Frozen(Door):
+            pass
+        sys.frozen = True
+        try:
+            self.assertEqual(set(), get_class_targets(Frozen))
+        finally:
+            del sys.frozen
+            prefetch._CLASS_TARGETS.pop(Frozen, None)
+
+
+class ScenePredictorTestCase(TestCase):
+    def setUp(self):
+        self.game = FakeGame(
+            scenes={
+                'room': Room('room', [Door()]),
+                'hall': Room('hall'),
+                'cellar': Room('cellar'),
+            },
+            detail_views={'lock': Room('lock')})
+        self.predictor = ScenePredictor()
+
+    def test_static(self):
+        self.assertEqual(
+            [], self.predictor.predict(self.game, ('room', False)))
+        self.predictor.load_targets(self.game)
+        self.assertEqual([('hall', False), ('lock', True)],
+                         self.predictor.predict(self.game, ('room', False)))
+        self.assertEqual(
+            [], self.predictor.predict(self.game, ('hall', False)))
+
+    def test_observed(self):
+        self.predictor.observe(('room', False), ('cellar', False))
+        self.predictor.observe(('room', False), ('lock', True))
+        self.predictor.observe(('room', False), ('lock', True))
+        self.predictor.observe(('room', False), ('gone', False))
+        self.predictor.load_targets(self.game)
+        self.assertEqual(
+            [('lock', True), ('cellar', False), ('hall', False)],
+            self.predictor.predict(self.game, ('room', False)))
@@ -1,9 +1,12 @@
 import os.path
+import threading
 from unittest import TestCase
 
 from pygame.surface import Surface
 
-from ..resources import Resources, ResourceNotFound
+from .. import resources
+from ..resources import (
+    Resources, ResourceNotFound, ImageCache, ImageLoader, image_bytes)
 
 
 TEST_PATH = os.path.dirname(__file__)
@@ -78,3 +81,165 @@ class ResourcesTestCase(TestCase):
             self.fail('Expected ResourceNotFound error.')
         except ResourceNotFound as e:
             self.assertEqual('images/should_not_exist', e.args[0])
+
+    def test_preload_images(self):
+        progress = []
+        self.res.preload_images(
+            ['pyntnclick/hand.png', ('pyntnclick', 'hand.png'),
+             'should_not_exist'], lambda *args: progress.append(args))
+        while self.res.update_preload():
+            pass
+        self.assertEqual([(1, 1)], progress)
+        self.assertEqual(1, len(self.res.image_cache))
+        self.assertTrue(isinstance(
+            self.res.get_image('pyntnclick/hand.png'), Surface))
+        self.assertEqual(0, self.res.image_cache.stats()['misses'])
+
+    def test_preload_evicted_in_use(self):
+        res = self.get_resource_loader(image_cache_bytes=1)
+        image = res.get_image('pyntnclick/hand.png')
+        self.assertEqual(0, len(res.image_cache))
+        res.preload_images(['pyntnclick/hand.png'])
+        self.assertFalse(res.update_preload())
+        self.assertTrue(image is res.get_image('pyntnclick/hand.png'))
+
+    def test_pin_images(self):
+        keys = self.res.pin_images(
+            ['pyntnclick/hand.png', 'should_not_exist'])
+        path = data_path('images/pyntnclick/hand.png')
+        self.assertEqual([(path, ())], keys)
+        self.assertEqual({(path, ()): 1}, self.res.image_cache._pins)
+        self.res.unpin_images(keys)
+        self.assertEqual({}, self.res.image_cache._pins)
+
+    def test_path_cache(self):
+        path = self.res.get_resource_path('test_resources.py')
+        self.assertEqual(
+            path, self.res._path_cache[('test_resources.py',)])
+        self.assertRaises(ResourceNotFound, self.res.get_resource_path,
+                          'should_not_exist')
+        self.assertEqual(None, self.res._path_cache[('should_not_exist',)])
+
+    def test_scan(self):
+        self.res.scan()
+        self.assertEqual(test_path('test_resources.py'),
+                         self.res.get_resource_path('test_resources.py'))
+        self.assertEqual(
+            data_path('images/pyntnclick/hand.png'),
+            self.res.get_resource_path('images', 'pyntnclick', 'hand.png'))
+        self.assertEqual(data_path('images'),
+                         self.res.get_resource_path('images'))
+        self.assertRaises(ResourceNotFound, self.res.get_resource_path,
+                          'should_not_exist')
+
+    def test_scan_unlisted_module(self):
+        real_resource_filename = resources.resource_filename
+
+        def resource_filename(module, path):
+            if module == Resources.DEFAULT_RESOURCE_MODULE and not path:
+                # As if the module were in a zip file
+                return data_path('__init__.py')
+            return real_resource_filename(module, path)
+        resources.resource_filename = resource_filename
+        try:
+            self.res.scan()
+        finally:
+            resources.resource_filename = real_resource_filename
+        # The other module is still scanned
+        self.assertTrue(
+            os.path.normpath(test_path('test_resources.py'))
+            in self.res._scanned_paths)
+        self.assertEqual(test_path('test_resources.py'),
+                         self.res.get_resource_path('test_resources.py'))
+        self.assertEqual(
+            data_path('images/pyntnclick/hand.png'),
+            self.res.get_resource_path('images', 'pyntnclick', 'hand.png'))
+
+    def test_get_image_cached(self):
+        image = self.res.get_image('pyntnclick/hand.png')
+        self.assertTrue(image is self.res.get_image('pyntnclick/hand.png'))
+        self.assertEqual(1, self.res.image_cache.stats()['hits'])
+        self.assertEqual(image_bytes(image), self.res.image_cache.bytes)
+
+
+class ImageCacheTestCase(TestCase):
+    def setUp(self):
+        self.size = image_bytes(Surface((10, 10)))
+        self.cache = ImageCache(self.size * 2)
+
+    def test_evict(self):
+        self.cache['a'] = Surface((10, 10))
+        self.cache['b'] = Surface((10, 10))
+        self.cache.get('a')
+        self.cache['c'] = Surface((10, 10))
+        self.assertEqual(['a', 'c'], sorted(self.cache._entries))
+        self.assertEqual(None, self.cache.get('b'))
+        self.assertEqual({'images': 2, 'bytes': self.size * 2, 'hits': 1,
+                          'misses': 1, 'evictions': 1}, self.cache.stats())
+
+    def test_pin(self):
+        self.cache['a'] = Surface((10, 10))
+        self.cache.pin('a')
+        self.cache['b'] = Surface((10, 10))
+        self.cache['c'] = Surface((10, 10))
+        self.assertEqual(['a', 'c'], sorted(self.cache._entries))
+        self.cache.unpin('a')
+        self.cache['d'] = Surface((10, 10))
+        self.assertEqual(['c', 'd'], sorted(self.cache._entries))
+
+    def test_unpin_not_pinned(self):
+        self.cache.pin('a')
+        self.cache.unpin('a')
+        self.cache.unpin('a')
+        self.cache.unpin('b')
+        self.assertEqual({}, self.cache._pins)
+
+    def test_evicted_in_use(self):
+        image = Surface((10, 10))
+        self.cache['a'] = image
+        self.cache['b'] = Surface((10, 10))
+        self.cache['c'] = Surface((10, 10))
+        self.assertFalse('a' in self.cache)
+        self.assertTrue(self.cache.has('a'))
+        self.assertFalse(self.cache.has('d'))
+        self.assertTrue(self.cache.get('a') is image)
+        self.assertTrue('a' in self.cache)
+
+
+class ImageLoaderTestCase(TestCase):
+    def setUp(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.loader = ImageLoader(1, self.load)
+        self.installed = []
+
+    def load(self, path):
+        self.started.set()
+        self.release.wait()
+        if path == 'bad':
+            raise ValueError(path)
+        return Surface((1, 1))
+
+    def install(self, path, image):
+        self.installed.append(path)
+
+    def test_take(self):
+        self.loader.load(['a', 'b'])
+        self.started.wait()
+        # 'b' hasn't started decoding, so we get nothing for it
+        self.assertEqual(None, self.loader.take('b'))
+        self.release.set()
+        self.assertTrue(isinstance(self.loader.take('a'), Surface))
+        self.assertEqual(None, self.loader.take('c'))
+        self.assertEqual(0, self.loader.update(self.install))
+        self.assertFalse(self.loader.loading())
+
+    def test_update(self):
+        progress = []
+        self.loader.load(['a', 'bad', 'c'], lambda *args: progress.append(
+            args))
+        self.release.set()
+        while self.loader.loading():
+            self.loader.update(self.install, 1)
+        self.assertEqual(['a', 'c'], self.installed)
+        self.assertEqual((3, 3), progress[-1])
@@ -0,0 +1,189 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from ..saving import SaveWorker, AutoSaver, StateJournal
+from ..state import GameState
+from .game_logic_utils import FakeClock
+
+
+class SaveWorkerTestCase(TestCase):
+    def setUp(self):
+        self.save_dir = tempfile.mkdtemp()
+        self.worker = SaveWorker()
+
+    def tearDown(self):
+        shutil.rmtree(self.save_dir)
+
+    def test_save(self):
+        state = GameState()
+        state.inventory().append('key')
+        self.worker.save(state, self.save_dir, 'test')
+        # Changes after the save was requested aren't saved
+        state.inventory().append('torch')
+        self.worker.flush()
+        loaded = GameState.load_game(self.save_dir, 'test')
+        self.assertEqual(['key'], loaded['inventories']['main'])
+        self.assertEqual(['test.sav'], os.listdir(self.save_dir))
+        self.assertEqual(None, self.worker.last_error)
+
+    def test_error(self):
+        # Something in the way of the save file
+        fn = GameState.get_save_fn(self.save_dir, 'test')
+        os.mkdir(fn)
+        self.worker.save(GameState(), self.save_dir, 'test')
+        self.worker.flush()
+        self.assertEqual([os.path.basename(fn)], os.listdir(self.save_dir))
+        self.assertTrue(self.worker.pop_error() is not None)
+        self.assertEqual(None, self.worker.pop_error())
+
+
+class ExportedState(GameState):
+    """Data exported from a GameState, to save later."""
+
+    def __init__(self, state):
+        self.data = state.export_save_data()
+
+    def export_save_data(self):
+        return self.data
+
+
+class HeldWorker(SaveWorker):
+    """A SaveWorker that only writes saves when told to."""
+
+    def __init__(self):
+        super(HeldWorker, self).__init__()
+        self.held = []
+
+    def save(self, state, *args):
+        self.held.append((ExportedState(state),) + args)
+
+    def release(self):
+        held, self.held = self.held, []
+        for args in held:
+            SaveWorker.save(self, *args)
+        self.flush()
+
+
+class StateJournalTestCase(TestCase):
+    def setUp(self):
+        self.save_dir = tempfile.mkdtemp()
+        self.worker = HeldWorker()
+        self.state = GameState()
+        self.state.initialize_state('door', {'open': False, 'keys': []})
+        self.journal = StateJournal(
+            self.state, self.worker, self.save_dir, 'test', 3)
+        # The first change starts the journal
+        self.state.set_current_scene('start')
+        self.worker.release()
+
+    def tearDown(self):
+        self.journal.close()
+        shutil.rmtree(self.save_dir)
+
+    def load(self):
+        return GameState.load_game(self.save_dir, 'test')
+
+    def test_replay(self):
+        self.state.set_data('door', 'open', True)
+        self.state.inventory().append('key')
+        self.state.inventory_changed()
+        loaded = self.load()
+        self.assertEqual({'open': True, 'keys': []}, loaded['door'])
+        self.assertEqual(['key'], loaded['inventories']['main'])
+        self.assertFalse('_journal' in loaded)
+
+    def test_compact(self):
+        for scene in ('hall', 'room', 'attic', 'cellar'):
+            self.state.set_current_scene(scene)
+        # Until the compacted save is written, the journal has everything
+        self.assertEqual('cellar', self.load()['current_scene'])
+        self.worker.release()
+        self.state.set_current_scene('cellar')
+        self.assertEqual('cellar', self.load()['current_scene'])
+        # The save has the changes up to the compaction
+        os.remove(StateJournal.get_journal_fn(self.save_dir, 'test'))
+        self.assertEqual('attic', self.load()['current_scene'])
+
+    def test_torn_write(self):
+        self.state.set_current_scene('hall')
+        fn = StateJournal.get_journal_fn(self.save_dir, 'test')
+        with open(fn, 'a') as f:
+            f.write('[3,"scene","at')
+        self.assertEqual('hall', self.load()['current_scene'])
+
+    def test_changed_in_place(self):
+        self.state.get_data('door', 'keys').append('brass')
+        self.state.sync_journal()
+        self.assertEqual(['brass'], self.load()['door']['keys'])
+
+    def test_recorded_copy(self):
+        self.state.set_current_scene('hall')
+        self.journal.compact()
+        inventory = self.state.inventory()
+        inventory.append('key')
+        self.state.inventory_changed()
+        # Not recorded, so not saved
+        inventory.append('torch')
+        # The journal is rewritten once the compacted save is written
+        self.worker.release()
+        self.state.set_current_scene('room')
+        self.assertEqual(['key'], self.load()['inventories']['main'])
+
+    def test_other_session(self):
+        self.state.set_data('door', 'open', True)
+        # A new game starts with its own save and journal
+        state = GameState()
+        self.journal.close()
+        self.journal = StateJournal(
+            state, self.worker, self.save_dir, 'test', 3)
+        # The old game's save and journal are intact until the new game
+        # changes and is saved
+        self.worker.release()
+        self.assertEqual(True, self.load()['door']['open'])
+        state.set_current_scene('hall')
+        self.assertEqual(True, self.load()['door']['open'])
+        self.worker.release()
+        self.assertFalse('door' in self.load())
+
+
+class RecordingWorker(object):
+    def __init__(self):
+        self.saves = []
+
+    def save(self, state, save_dir, save_name):
+        self.saves.append((state, save_dir, save_name))
+
+
+class AutoSaverTestCase(TestCase):
+    def setUp(self):
+        self.worker = RecordingWorker()
+        self.clock = FakeClock()
+        self.autosaver = AutoSaver(
+            self.worker, 'dir', 'auto', 10, clock=self.clock)
+        self.state = GameState()
+
+    def test_no_request(self):
+        self.assertFalse(self.autosaver.tick(self.state))
+        self.assertEqual([], self.worker.saves)
+
+    def test_coalesce(self):
+        self.autosaver.request()
+        self.assertTrue(self.autosaver.tick(self.state))
+        self.clock.now = 1
+        self.autosaver.request()
+        self.autosaver.request()
+        self.assertFalse(self.autosaver.tick(self.state))
+        self.clock.now = 10
+        self.assertTrue(self.autosaver.tick(self.state))
+        self.assertFalse(self.autosaver.tick(self.state))
+        self.assertEqual(
+            [(self.state, 'dir', 'auto')] * 2, self.worker.saves)
+
+    def test_save_now(self):
+        self.autosaver.request()
+        self.autosaver.tick(self.state)
+        self.autosaver.request()
+        self.assertTrue(self.autosaver.save_now(self.state))
+        self.assertEqual(2, len(self.worker.saves))
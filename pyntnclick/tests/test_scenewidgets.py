@@ -0,0 +1,79 @@
+from unittest import TestCase
+
+from pygame import Surface
+
+from ..scenewidgets import InteractAnimated, InteractSpriteSheet
+from .game_logic_utils import FakeGame
+
+
+class FakeResources(object):
+    def get_image(self, folder, name):
+        if name == 'sheet':
+            # 3 x 2 frames, numbered from 1 in their top-left pixels
+            image = Surface((30, 20))
+            for i in range(6):
+                image.set_at(((i % 3) * 10, (i // 3) * 10), (i + 1, 0, 0))
+            return image
+        image = Surface((10, 10))
+        image.fill((int(name), 0, 0))
+        return image
+
+
+class FakeThing(object):
+    folder = 'things'
+    resource = FakeResources()
+
+    def __init__(self):
+        self.game = FakeGame()
+
+
+class InteractAnimatedTestCase(TestCase):
+    def setUp(self):
+        self.thing = FakeThing()
+        self.interact = InteractAnimated(0, 0, ['1', '2', '3'], 1)
+        self.interact.set_thing(self.thing)
+        self.clock = self.thing.game.animation_clock
+
+    def image(self):
+        return self.interact.image.get_at((0, 0))[0]
+
+    def test_animate(self):
+        self.assertFalse(self.interact.animate())
+        self.clock.frame = 1
+        self.assertFalse(self.interact.animate())
+        self.clock.frame = 2
+        self.assertTrue(self.interact.animate())
+        self.assertEqual(2, self.image())
+
+    def test_catch_up(self):
+        # Skip straight to the image we should be showing
+        self.clock.frame = 10
+        self.assertTrue(self.interact.animate())
+        self.assertEqual(3, self.image())
+
+    def test_animation_delay(self):
+        # The image changes every 2 frames at 25 frames a second
+        self.assertAlmostEqual(0.08, self.interact.animation_delay(self.clock))
+        self.clock.frame = 2
+        self.assertAlmostEqual(0.16, self.interact.animation_delay(self.clock))
+        still = InteractAnimated(0, 0, ['1'], 1)
+        still.set_thing(self.thing)
+        self.assertEqual(None, still.animation_delay(self.clock))
+
+
+class InteractSpriteSheetTestCase(TestCase):
+    def test_frames(self):
+        thing = FakeThing()
+        interact = InteractSpriteSheet(5, 5, 'sheet', (10, 10), 0)
+        interact.set_thing(thing)
+        self.assertEqual((5, 5, 10, 10), interact.rect)
+        images = [image.get_at((0, 0))[0] for image in interact._anim_seq]
+        self.assertEqual([1, 2, 3, 4, 5, 6], images)
+        thing.game.animation_clock.frame = 4
+        interact.animate()
+        self.assertEqual(5, interact.image.get_at((0, 0))[0])
+
+    def test_frame_count(self):
+        interact = InteractSpriteSheet(0, 0, 'sheet', (10, 10), 0, 4)
+        interact.set_thing(FakeThing())
+        self.assertEqual(4, len(interact._anim_seq))
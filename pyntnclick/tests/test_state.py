@@ -0,0 +1,410 @@
+import json
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from pygame import Rect, Surface
+
+from ..scenewidgets import InteractNoImage
+from ..state import (Game, GameState, Item, Scene, Thing, ThingIndex,
+                     get_interact_handler)
+from ..utils import AnimationClock
+from .game_logic_utils import FakeClock, FakeGameDescription
+
+
+def make_thing(name, rect):
+    thing = Thing()
+    thing.name = name
+    thing.rect = rect
+    return thing
+
+
+class RoundThing(Thing):
+    def contains(self, pos):
+        return pos == (500, 500)
+
+
+class ThingIndexTestCase(TestCase):
+    def setUp(self):
+        self.index = ThingIndex(32)
+
+    def test_find(self):
+        thing = make_thing('a', Rect(10, 10, 100, 20))
+        self.index.add(thing)
+        self.assertEqual(thing, self.index.find((105, 15)))
+        self.assertEqual(None, self.index.find((105, 35)))
+        self.assertEqual(None, self.index.find((-5, -5)))
+
+    def test_rect_list(self):
+        thing = make_thing('a', [Rect(0, 0, 5, 5), Rect(200, 200, 5, 5)])
+        self.index.add(thing)
+        self.assertEqual(thing, self.index.find((202, 202)))
+        self.assertEqual(None, self.index.find((100, 100)))
+
+    def test_priority(self):
+        first = make_thing('first', Rect(0, 0, 50, 50))
+        second = make_thing('second', Rect(0, 0, 100, 100))
+        self.index.add(second)
+        self.index.add(first)
+        self.assertEqual(second, self.index.find((10, 10)))
+        self.index.remove(second)
+        self.assertEqual(first, self.index.find((10, 10)))
+        self.index.add(second)
+        self.assertEqual(first, self.index.find((10, 10)))
+
+    def test_update(self):
+        thing = make_thing('a', Rect(0, 0, 10, 10))
+        self.index.add(thing)
+        thing.rect = Rect(100, 100, 10, 10)
+        self.index.update(thing)
+        self.assertEqual(None, self.index.find((5, 5)))
+        self.assertEqual(thing, self.index.find((105, 105)))
+
+    def test_custom_contains(self):
+        thing = RoundThing()
+        thing.name = 'round'
+        self.index.add(thing)
+        self.assertEqual(thing, self.index.find((500, 500)))
+        self.assertEqual(None, self.index.find((501, 500)))
+
+
+class GameStateTestCase(TestCase):
+    INITIAL_DATA = {'open': False, 'items': []}
+
+    def setUp(self):
+        self.state = GameState()
+        self.state.initialize_state('door', self.INITIAL_DATA)
+
+    def test_initial_data_untouched(self):
+        self.state.set_data('door', 'open', True)
+        self.state.get_data('door', 'items').append('key')
+        self.assertEqual({'open': False, 'items': []}, self.INITIAL_DATA)
+        self.assertEqual(True, self.state.get_data('door', 'open'))
+        self.assertEqual(['key'], self.state.get_data('door', 'items'))
+
+    def test_snapshot(self):
+        self.state.set_data('door', 'open', True)
+        snapshot = self.state.snapshot()
+        self.state.set_data('door', 'open', False)
+        self.state.inventory().append('key')
+        snapshot.set_current_scene('hall')
+        self.assertEqual(True, snapshot.get_data('door', 'open'))
+        self.assertEqual([], snapshot.inventory())
+        self.assertEqual(False, self.state.get_data('door', 'open'))
+        self.assertEqual(['key'], self.state.inventory())
+        self.assertEqual(None, self.state['current_scene'])
+        self.assertEqual('hall', snapshot['current_scene'])
+
+    def test_restore(self):
+        snapshot = self.state.snapshot()
+        self.state.set_data('door', 'open', True)
+        self.state.restore(snapshot)
+        self.assertEqual(False, self.state.get_data('door', 'open'))
+        self.state.get_data('door', 'items').append('key')
+        self.state.restore(snapshot)
+        self.assertEqual([], self.state.get_data('door', 'items'))
+
+    def test_export_data(self):
+        self.state.inventory().append('key')
+        data = self.state.export_data()
+        self.state.inventory().append('torch')
+        self.state.set_data('door', 'open', True)
+        self.assertEqual(['key'], data['inventories']['main'])
+        self.assertEqual(False, data['door']['open'])
+        self.assertEqual(['key', 'torch'], self.state.inventory())
+
+    def test_export_data_copy(self):
+        data = self.state.export_data()
+        data['door']['open'] = True
+        data['inventories']['main'].append('key')
+        self.assertEqual(False, self.state.get_data('door', 'open'))
+        self.assertEqual([], self.state.inventory())
+
+    def test_shared_data(self):
+        data = self.state.shared_data()
+        self.state.set_data('door', 'open', True)
+        self.assertEqual(False, data['door']['open'])
+
+
+class Torch(Item):
+    NAME = 'torch'
+
+    def interact_with_lamp(self, thing):
+        return 'torch on lamp'
+
+
+class Match(Item):
+    NAME = 'match'
+
+
+class Candle(Thing):
+    def interact_with_match(self, item):
+        return 'lit'
+
+    @staticmethod
+    def interact_with_torch(item):
+        return 'static'
+
+
+class Snuffer(Candle):
+    interact_with_match = None
+
+    def interact_default(self, item):
+        return 'default'
+
+
+class InteractDispatchTestCase(TestCase):
+    def test_handlers(self):
+        candle = Candle()
+        self.assertEqual('lit', candle.interact(Match()))
+        self.assertEqual('static', candle.interact(Torch()))
+        self.assertEqual(None, get_interact_handler(candle, 'key'))
+
+    def test_subclass(self):
+        snuffer = Snuffer()
+        self.assertEqual('default', snuffer.interact(Match()))
+        self.assertEqual('static', snuffer.interact(Torch()))
+
+    def test_inverse(self):
+        match = Match()
+        match.tool_name = 'lamp'
+        self.assertEqual('torch on lamp', match.interact(Torch()))
+
+
+class Lamp(Thing):
+    NAME = 'lamp'
+    INTERACTS = {
+        'off': InteractNoImage(0, 0, 10, 10),
+        'on': InteractNoImage(0, 0, 20, 20),
+        }
+    INITIAL = 'off'
+    INITIAL_DATA = {'lit': False}
+
+
+class Room(Scene):
+    NAME = 'room'
+
+    def setup(self):
+        self.add_thing(Lamp())
+
+
+class GameSnapshotTestCase(TestCase):
+    def setUp(self):
+        self.game = Game(FakeGameDescription(), GameState())
+        self.game.add_scene(Room(self.game))
+        self.scene = self.game.scenes['room']
+        self.lamp = self.scene.things['lamp']
+        self.snapshot = self.game.snapshot()
+
+    def test_restore(self):
+        self.lamp.set_data('lit', True)
+        self.lamp._set_interact('on')
+        self.game.restore(self.snapshot)
+        self.assertEqual(False, self.lamp.get_data('lit'))
+        self.assertTrue(self.lamp.current_interact is Lamp.INTERACTS['off'])
+        self.scene.update_current_thing((15, 15))
+        self.assertEqual(None, self.scene.current_thing)
+
+    def test_restore_removed_thing(self):
+        self.scene.remove_thing(self.lamp)
+        self.game.restore(self.snapshot)
+        self.assertEqual(self.lamp, self.scene.things['lamp'])
+        self.scene.update_current_thing((5, 5))
+        self.assertEqual(self.lamp, self.scene.current_thing)
+
+
+class Clock(Thing):
+    NAME = 'clock'
+    INTERACTS = {'clock': InteractNoImage(0, 0, 5, 5)}
+    INITIAL = 'clock'
+
+    def animate(self):
+        return True
+
+
+class StaticLayerTestCase(TestCase):
+    def setUp(self):
+        self.game = Game(FakeGameDescription(), GameState())
+        self.game.add_scene(Room(self.game))
+        self.scene = self.game.scenes['room']
+        self.surface = Surface((50, 50))
+
+    def test_cached(self):
+        self.scene.draw(self.surface)
+        self.assertEqual([], self.scene._dynamic_things)
+        layer = self.scene._static_layer
+        self.scene.draw(self.surface)
+        self.assertTrue(self.scene._static_layer is layer)
+        self.assertEqual((200, 200, 200, 255), self.surface.get_at((1, 1)))
+
+    def test_invalidate(self):
+        self.scene.draw(self.surface)
+        self.scene.things['lamp']._set_interact('on')
+        self.assertEqual(None, self.scene._static_layer_key)
+        self.scene.draw(self.surface)
+        self.game.set_debug_rects()
+        self.scene.draw(self.surface)
+        self.assertEqual(((50, 50), True), self.scene._static_layer_key)
+
+    def test_small_background(self):
+        self.scene.OFFSET = (10, 10)
+        self.scene._background = Surface((20, 20))
+        self.scene._background.fill((255, 0, 0))
+        self.scene.draw(self.surface)
+        self.assertEqual((255, 0, 0, 255), self.surface.get_at((15, 15)))
+        self.assertEqual((200, 200, 200, 255), self.surface.get_at((5, 5)))
+        self.assertEqual((200, 200, 200, 255), self.surface.get_at((40, 40)))
+
+    def test_release_images(self):
+        self.scene.draw(self.surface)
+        self.scene.release_images()
+        self.assertEqual(None, self.scene._static_layer)
+        self.assertEqual(None, self.scene._static_layer_key)
+
+    def test_dynamic_things(self):
+        clock = Clock()
+        self.scene.add_thing(clock)
+        self.scene.draw(self.surface)
+        self.assertEqual([clock], self.scene._dynamic_things)
+
+
+class PreloadRecorder(object):
+    def __init__(self):
+        self.preloaded = []
+
+    def preload_images(self, image_names, callback=None):
+        self.preloaded.extend(image_names)
+
+
+class Painting(Thing):
+    NAME = 'painting'
+    INTERACTS = {'painting': InteractNoImage(0, 0, 5, 5)}
+    INITIAL = 'painting'
+
+    def get_image_names(self):
+        return [('room', 'painting.png')]
+
+
+class Gallery(Scene):
+    NAME = 'gallery'
+    FOLDER = 'room'
+    BACKGROUND = 'gallery.png'
+
+    def setup(self):
+        self.add_thing(Painting())
+
+
+class PreloadTestCase(TestCase):
+    def test_background_only(self):
+        gd = FakeGameDescription()
+        gd.resource = PreloadRecorder()
+        game = Game(gd, GameState())
+        game.add_scene(Gallery(game))
+        scene = game.scenes['gallery']
+        scene.preload_images()
+        self.assertEqual([('room', 'gallery.png')], gd.resource.preloaded)
+        self.assertEqual([('room', 'gallery.png'), ('room', 'painting.png')],
+                         scene.get_image_names())
+
+
+class Ticker(Thing):
+    NAME = 'ticker'
+    INTERACTS = {'ticker': InteractNoImage(0, 0, 5, 5)}
+    INITIAL = 'ticker'
+
+    def animate(self):
+        return self.game.animation_clock.frame % 2 == 0
+
+    def get_draw_rect(self):
+        return Rect(1, 2, 3, 4)
+
+
+class SceneAnimateTestCase(TestCase):
+    def setUp(self):
+        self.game = Game(FakeGameDescription(), GameState())
+        self.game.add_scene(Room(self.game))
+        self.scene = self.game.scenes['room']
+        self.ticker = Ticker()
+        self.scene.add_thing(self.ticker)
+
+    def test_animated_things(self):
+        self.scene.animate()
+        self.assertEqual([self.ticker], self.scene._animated_things)
+        self.assertTrue(self.scene.is_animated())
+        self.scene.remove_thing(self.ticker)
+        self.assertFalse(self.scene.animate())
+        self.assertEqual([], self.scene._animated_things)
+        self.assertFalse(self.scene.is_animated())
+
+    def test_animation_delay(self):
+        self.game.animation_clock = AnimationClock(25, clock=FakeClock())
+        # Ticker's animate is its own, so it's checked every frame
+        self.assertAlmostEqual(0.04, self.scene.animation_delay())
+        self.scene.remove_thing(self.ticker)
+        self.assertEqual(None, self.scene.animation_delay())
+
+    def test_changed_rects(self):
+        self.assertTrue(self.scene.animate())
+        self.assertEqual([Rect(1, 2, 3, 4)], self.scene.changed_rects)
+        self.game.animation_clock.frame += 1
+        self.assertFalse(self.scene.animate())
+        self.assertEqual([], self.scene.changed_rects)
+        self.scene.add_thing(Clock())
+        self.assertTrue(self.scene.animate())
+        self.assertEqual(None, self.scene.changed_rects)
+
+
+class SaveGameTestCase(TestCase):
+    def setUp(self):
+        self.save_dir = tempfile.mkdtemp()
+        self.initial_data = {'open': False}
+        self.state = GameState()
+        self.state.initialize_state('door', self.initial_data)
+        self.state.initialize_state('window', {'open': False})
+
+    def tearDown(self):
+        shutil.rmtree(self.save_dir)
+
+    def test_delta(self):
+        self.state.set_data('window', 'open', True)
+        self.state.get_data('door', 'open')
+        data = self.state.export_save_data()
+        self.assertFalse('door' in data)
+        self.assertEqual({'open': True}, data['window'])
+        self.assertEqual(None, data['current_scene'])
+
+    def test_delta_changed_back(self):
+        self.state.set_data('door', 'open', True)
+        self.state.set_data('door', 'open', False)
+        self.assertFalse('door' in self.state.export_save_data())
+
+    def test_compact_round_trip(self):
+        self.state.set_data('window', 'open', True)
+        self.state.inventory().append('key')
+        self.state.save_game(self.save_dir, 'test')
+        self.assertEqual(['test.sav'], os.listdir(self.save_dir))
+        loaded = GameState(GameState.load_game(self.save_dir, 'test'))
+        loaded.initialize_state('door', self.initial_data)
+        loaded.initialize_state('window', {'open': False})
+        self.assertEqual(False, loaded.get_data('door', 'open'))
+        self.assertEqual(True, loaded.get_data('window', 'open'))
+        self.assertEqual(['key'], loaded.inventory())
+
+    def test_bad_version(self):
+        raw = GameState.encode_save_data({})
+        raw = raw[:4] + b'\xff' + raw[5:]
+        self.assertRaises(ValueError, GameState.decode_save_data,
+                          raw, 'compact')
+
+    def test_load_json(self):
+        f = open(os.path.join(self.save_dir, 'old.json'), 'w')
+        json.dump({'current_scene': 'hall'}, f)
+        f.close()
+        self.assertTrue(GameState.has_save_game(self.save_dir, 'old'))
+        self.assertEqual({'current_scene': 'hall'},
+                         GameState.load_game(self.save_dir, 'old'))
+
+    def test_no_save(self):
+        self.assertFalse(GameState.has_save_game(self.save_dir, 'missing'))
+        self.assertEqual(None, GameState.load_game(self.save_dir, 'missing'))
@@ -0,0 +1,104 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from ..utils import AnimationClock, LRUCache, atomic_write
+from .game_logic_utils import FakeClock
+
+
+class LRUCacheTestCase(TestCase):
+    def test_get_missing(self):
+        cache = LRUCache(2)
+        self.assertEqual(None, cache.get('a'))
+        self.assertEqual(0, cache.get('a', 0))
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(2)
+        cache['a'] = 1
+        cache['b'] = 2
+        cache.get('a')
+        cache['c'] = 3
+        self.assertEqual(2, len(cache))
+        self.assertTrue('a' in cache)
+        self.assertFalse('b' in cache)
+        self.assertTrue('c' in cache)
+
+    def test_replace(self):
+        cache = LRUCache(2)
+        cache['a'] = 1
+        cache['a'] = 2
+        self.assertEqual(1, len(cache))
+        self.assertEqual(2, cache.get('a'))
+
+    def test_size(self):
+        cache = LRUCache(5, size=len)
+        cache['a'] = 'xx'
+        cache['b'] = 'xxx'
+        self.assertEqual(5, cache.total_size)
+        cache['c'] = 'x'
+        self.assertEqual(['b', 'c'], sorted(cache._entries))
+        self.assertEqual(4, cache.total_size)
+        cache.discard('b')
+        self.assertEqual(1, cache.total_size)
+
+
+class AtomicWriteTestCase(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.fn = os.path.join(self.tmp_dir, 'file')
+        with open(self.fn, 'w') as f:
+            f.write('old')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def read(self):
+        with open(self.fn) as f:
+            return f.read()
+
+    def test_replace(self):
+        with atomic_write(self.fn, 'w') as f:
+            f.write('new')
+            self.assertEqual('old', self.read())
+        self.assertEqual('new', self.read())
+        self.assertEqual(['file'], os.listdir(self.tmp_dir))
+
+    def test_error(self):
+        try:
+            with atomic_write(self.fn, 'w') as f:
+                f.write('new')
+                raise ValueError()
+        except ValueError:
+            pass
+        self.assertEqual('old', self.read())
+        self.assertEqual(['file'], os.listdir(self.tmp_dir))
+
+
+class AnimationClockTestCase(TestCase):
+    def test_time_based(self):
+        clock = FakeClock(100.0)
+        animation_clock = AnimationClock(25, clock=clock)
+        animation_clock.tick()
+        self.assertEqual(0, animation_clock.frame)
+        clock.now += 0.1
+        animation_clock.tick()
+        self.assertEqual(2, animation_clock.frame)
+        # A slow frame skips ahead
+        clock.now += 1
+        animation_clock.tick()
+        self.assertEqual(27, animation_clock.frame)
+
+    def test_time_to_next_frame(self):
+        clock = FakeClock(100.0)
+        animation_clock = AnimationClock(25, clock=clock)
+        self.assertAlmostEqual(0.04, animation_clock.time_to_next_frame())
+        clock.now += 0.05
+        self.assertAlmostEqual(0.03, animation_clock.time_to_next_frame())
+
+    def test_time_to_frame(self):
+        clock = FakeClock(100.0)
+        animation_clock = AnimationClock(25, clock=clock)
+        self.assertAlmostEqual(0.2, animation_clock.time_to_frame(5))
+        clock.now += 0.25
+        self.assertAlmostEqual(-0.05, animation_clock.time_to_frame(5))
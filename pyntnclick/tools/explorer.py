@@ -0,0 +1,313 @@
+# Breadth-first search over every game state reachable by clicking,
+# to check a game can be completed and find dead ends and crashes
+
+from __future__ import print_function, division
+
+import hashlib
+import json
+import traceback
+from collections import deque
+
+from ..engine import get_event_bus, ScreenChangeEvent
+from ..utils import LRUCache
+from .pool import GamePool
+
+
+def state_key(data, details):
+    """Return the canonical form of a game state and a hash of it."""
+    text = json.dumps([data, list(details)], sort_keys=True,
+                      separators=(',', ':'))
+    return text, hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def format_action(action):
+    kind, target, tool = action
+    if kind == 'close':
+        return 'close %s' % (target,)
+    if tool is None:
+        return '%s %s' % (kind, target)
+    return '%s %s with %s' % (kind, target, tool)
+
+
+class GameExplorer(object):
+    """Expands game states, in the process running the game.
+
+    States are the exported game data plus the stack of open detail
+    views. Each process has a single Game, restored from a snapshot
+    before trying each action, as in GameLogicTestCase. We keep snapshots
+    of the states we've produced, and reach states we have no snapshot
+    of by replaying the actions leading to them from the start."""
+
+    def __init__(self, gd, cache_size=256):
+        self.gd = gd
+        # map of state hash -> (GameSnapshot, detail views)
+        self._snapshots = LRUCache(cache_size)
+        self._game = None
+        self._start = None
+        self._details = []
+        self._ended = False
+
+    def _get_game(self):
+        if self._game is None:
+            game = self.gd.initial_state()
+            get_event_bus().clear()
+            # We aren't handling events, so follow scene changes ourselves
+            game.change_scene = lambda name: self._change_scene(game, name)
+            game.show_detail = lambda name: self._show_detail(game, name)
+            self._game = game
+            self._start = game.snapshot()
+        return self._game
+
+    def start_key(self):
+        """Return the hash of the state at the start of the game."""
+        game = self._get_game()
+        game.restore(self._start)
+        return state_key(game.data.shared_data(), [])[1]
+
+    def _load(self, key, path):
+        game = self._get_game()
+        cached = self._snapshots.get(key)
+        if cached is not None:
+            snapshot, details = cached
+            game.restore(snapshot)
+            return snapshot, details
+        game.restore(self._start)
+        self._details = []
+        for action in path:
+            self.perform(game, action)
+        get_event_bus().clear()
+        details = list(self._details)
+        if state_key(game.data.shared_data(), details)[1] != key:
+            raise ValueError("Replaying %s didn't reach the same state" % (
+                ', '.join(format_action(a) for a in path),))
+        snapshot = game.snapshot()
+        self._snapshots[key] = (snapshot, details)
+        return snapshot, details
+
+    def _change_scene(self, game, name):
+        # Leave the open detail views and the scene, as GameScreen does
+        details, self._details = self._details, []
+        for detail in reversed(details):
+            self._handle_result(game.detail_views[detail].leave())
+        self._handle_result(game.get_current_scene().leave())
+        game.data.set_current_scene(name)
+        self._handle_result(game.scenes[name].enter())
+
+    def _show_detail(self, game, name):
+        if self._details and self._details[-1] == name:
+            return
+        self._details.append(name)
+        self._handle_result(game.detail_views[name].enter())
+
+    def _handle_result(self, result):
+        if result is None:
+            return True
+        if not hasattr(result, 'process'):
+            # We don't allow sequences to contain sequences
+            return all(hasattr(r, 'process') and self._handle_result(r)
+                       for r in result if r is not None)
+        if result.detail_view:
+            self._show_detail(self._game, result.detail_view)
+        if result.end_game:
+            self._ended = True
+        return True
+
+    def actions(self, game):
+        """List the actions possible in the current state."""
+        inventory = [None] + list(game.inventory())
+        if self._details:
+            things = game.detail_views[self._details[-1]].things
+            actions = [('close', self._details[-1], None)]
+        else:
+            things = game.get_current_scene().things
+            actions = []
+        for name in things:
+            actions.extend(('thing', name, tool) for tool in inventory)
+        for item in inventory[1:]:
+            # Items are only used with other items
+            actions.extend(('item', item, tool) for tool in inventory[1:]
+                           if tool != item)
+        return actions
+
+    def perform(self, game, action):
+        """Perform an action, returning whether the result was valid."""
+        kind, target, tool = action
+        if kind == 'close':
+            self._details.pop()
+            return self._handle_result(
+                game.detail_views[target].leave())
+        tool = game.get_item(tool) if tool is not None else None
+        if kind == 'item':
+            target = game.get_item(target)
+        elif self._details:
+            target = game.detail_views[self._details[-1]].things[target]
+        else:
+            target = game.get_current_scene().things[target]
+        return self._handle_result(target.interact(tool))
+
+    def expand(self, key, path):
+        """Try every action in a state.
+
+        path is the list of actions reaching the state from the start.
+        Returns a list of (action, state hash, ended) for the actions that
+        worked, and of (action, error) for those that didn't.
+        """
+        game = self._get_game()
+        snapshot, details = self._load(key, path)
+        self._details = list(details)
+        children = []
+        errors = []
+        for action in self.actions(game):
+            game.restore(snapshot)
+            self._details = list(details)
+            self._ended = False
+            try:
+                if not self.perform(game, action):
+                    errors.append((action, 'Unexpected result'))
+                    continue
+            except Exception:
+                errors.append((action, traceback.format_exc()))
+                continue
+            finally:
+                for ev in get_event_bus().drain():
+                    if (ScreenChangeEvent.matches(ev)
+                            and ev.screen_name == 'end'):
+                        self._ended = True
+            child_key = state_key(game.data.shared_data(), self._details)[1]
+            if child_key not in self._snapshots:
+                self._snapshots[child_key] = (game.snapshot(),
+                                              list(self._details))
+            children.append((action, child_key, self._ended))
+        game.restore(snapshot)
+        return children, errors
+
+
+class ExplorationReport(object):
+    """What StateExplorer found."""
+
+    def __init__(self):
+        # map of state hash -> (parent hash, action), None for the start
+        self.parents = {}
+        # map of state hash -> hashes of the states reachable in one step
+        self.edges = {}
+        # map of state hash -> an action in that state ending the game
+        self.endings = {}
+        # list of (state hash, action, error)
+        self.errors = []
+        # Whether we stopped at max_states before seeing everything
+        self.truncated = False
+
+    @property
+    def completable(self):
+        return bool(self.endings)
+
+    def walkthrough(self, key):
+        """Return the shortest list of actions reaching a state."""
+        actions = []
+        while self.parents[key] is not None:
+            key, action = self.parents[key]
+            actions.append(action)
+        actions.reverse()
+        return actions
+
+    def dead_ends(self):
+        """Return the states from which the game can't be completed."""
+        if self.truncated:
+            # We don't know where the unexplored states lead
+            return set()
+        reverse = dict((key, set()) for key in self.edges)
+        for key, children in self.edges.items():
+            for child in children:
+                reverse.setdefault(child, set()).add(key)
+        can_end = set(self.endings)
+        pending = deque(self.endings)
+        while pending:
+            for parent in reverse.get(pending.popleft(), ()):
+                if parent not in can_end:
+                    can_end.add(parent)
+                    pending.append(parent)
+        return set(self.parents) - can_end
+
+    def format(self):
+        lines = ['Explored %d states%s' % (
+            len(self.parents), ' (stopped early)' if self.truncated else '')]
+        if self.endings:
+            key = min(self.endings,
+                      key=lambda key: len(self.walkthrough(key)))
+            lines.append('Shortest walkthrough:')
+            lines.extend('  ' + format_action(action)
+                         for action in self.walkthrough(key))
+            lines.append('  ' + format_action(self.endings[key]))
+        else:
+            lines.append('No way to complete the game found')
+        dead_ends = self.dead_ends() if self.endings else set()
+        if dead_ends:
+            lines.append('%d dead end states, such as after:' % (
+                len(dead_ends),))
+            key = min(dead_ends, key=lambda key: len(self.walkthrough(key)))
+            lines.extend('  ' + format_action(action)
+                         for action in self.walkthrough(key))
+        for key, action, error in self.errors:
+            lines.append('Error on %s after %s:' % (
+                format_action(action),
+                ', '.join(format_action(a) for a in self.walkthrough(key))
+                or 'starting'))
+            lines.append(error)
+        return '\n'.join(lines)
+
+
+class StateExplorer(object):
+    """Explore every game state reachable from the start of a game.
+
+    This tries every thing in the current scene or detail view with no
+    item and with every inventory item, and every inventory item with
+    every other, breadth first. States are told apart by a hash of their
+    exported data, so each is only expanded once. The states in each
+    level of the search are shared out between a pool of processes.
+
+    gd_class is the GameDescription class, which must be importable, and
+    its game must keep all its state in the GameState, as it must for
+    saving."""
+
+    def __init__(self, gd_class, processes=None, max_states=None):
+        self.gd_class = gd_class
+        self.processes = processes
+        self.max_states = max_states
+
+    def run(self):
+        pool = GamePool(GameExplorer, self.gd_class, self.processes)
+        try:
+            return self._search(pool)
+        finally:
+            # We may have stopped early, so don't wait for the rest
+            pool.terminate()
+
+    def _search(self, pool):
+        report = ExplorationReport()
+        start_key = pool.worker.start_key()
+        report.parents[start_key] = None
+        level = [(start_key, [])]
+        while level:
+            next_level = []
+            chunksize = max(1, len(level) // (pool.processes * 4))
+            results = pool.imap('expand', level, chunksize)
+            for i, ((key, path), (children, errors)) in enumerate(
+                    zip(level, results)):
+                report.edges[key] = set()
+                for action, error in errors:
+                    report.errors.append((key, action, error))
+                for action, child_key, ended in children:
+                    if ended:
+                        # Nothing happens after the game ends
+                        report.endings.setdefault(key, action)
+                        continue
+                    report.edges[key].add(child_key)
+                    if child_key not in report.parents:
+                        report.parents[child_key] = (key, action)
+                        next_level.append((child_key, path + [action]))
+                if (self.max_states is not None
+                        and len(report.parents) >= self.max_states):
+                    report.truncated = bool(next_level) or i + 1 < len(level)
+                    return report
+            level = next_level
+        return report
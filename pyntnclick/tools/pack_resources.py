@@ -0,0 +1,56 @@
+# Pack a resource module into an asset pack, so games load their
+# resources from a single file
+#
+# Usage: python -m pyntnclick.tools.pack_resources <resource module>
+
+from __future__ import print_function
+
+import os
+import sys
+from optparse import OptionParser
+
+from pkg_resources import resource_filename
+
+from ..assetpack import build_pack, PACK_NAME
+
+# gettext needs the compiled translations as real files, and the games
+# never load the source files the images are made from
+DEFAULT_EXCLUDE = ['locale', 'po', 'sources']
+
+
+def option_parser():
+    parser = OptionParser(
+        usage='%prog [options] <resource module>',
+        description=(
+            'Pack the files in a resource module, including the language'
+            ' subdirectories, into %s in the module.' % (PACK_NAME,)))
+    parser.add_option(
+        '-o', '--output', default=None, dest='output',
+        help='write the pack here instead')
+    parser.add_option(
+        '-x', '--exclude', action='append', default=None, dest='exclude',
+        help=('leave out a top level directory (may be repeated; default:'
+              ' %s)' % (', '.join(DEFAULT_EXCLUDE),)))
+    return parser
+
+
+def main(args=None):
+    parser = option_parser()
+    opts, args = parser.parse_args(args)
+    if len(args) != 1:
+        parser.error('expected one resource module')
+    root = resource_filename(args[0], '')
+    if not os.path.isdir(root):
+        parser.error('%s is not a directory' % (root,))
+    output = opts.output
+    if output is None:
+        output = os.path.join(root, PACK_NAME)
+    exclude = opts.exclude if opts.exclude is not None else DEFAULT_EXCLUDE
+    names = build_pack(root, output, exclude)
+    print('Packed %d files into %s (%d bytes)' % (
+        len(names), output, os.path.getsize(output)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+# Share work on a game out between a pool of processes, each with its own
+# worker object holding its own Game
+
+import multiprocessing
+
+from .. import resources
+
+
+# The worker for this process
+_worker = None
+
+
+def _init_worker(worker_class, gd_class):
+    global _worker
+    # Disable alpha conversion which requires a screen
+    resources.Resources.CONVERT_ALPHA = False
+    _worker = worker_class(gd_class())
+
+
+def _call_worker(call):
+    method, args = call
+    return getattr(_worker, method)(*args)
+
+
+class GamePool(object):
+    """A pool of processes, each with a worker_class(gd_class()).
+
+    There's always a worker in this process too, as worker, and with one
+    process the work is done by it rather than by a pool. gd_class, the
+    GameDescription class, and worker_class must be importable."""
+
+    def __init__(self, worker_class, gd_class, processes=None):
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+        self.processes = processes
+        _init_worker(worker_class, gd_class)
+        self.worker = _worker
+        self._pool = None
+        if processes > 1:
+            self._pool = multiprocessing.Pool(
+                processes, _init_worker, (worker_class, gd_class))
+
+    def imap(self, method, arg_lists, chunksize=1):
+        """Call the workers' method with each list of args, returning an
+        iterator over the results in order."""
+        calls = [(method, tuple(args)) for args in arg_lists]
+        if self._pool is None:
+            return (getattr(self.worker, method)(*args)
+                    for method, args in calls)
+        return self._pool.imap(_call_worker, calls, chunksize)
+
+    def close(self):
+        """Wait for the work we've asked for and stop the pool."""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+
+    def terminate(self):
+        """Stop the pool without waiting for the rest of the work."""
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
@@ -11,6 +11,7 @@ import pygame
 import os
 
 from .. import constants
+from ..engine import get_event_bus
 from ..i18n import _
 from ..utils import draw_rect_image
 
@@ -261,6 +262,7 @@ class AppImage(Container):
                 thing._interact_hilight_color = None
             else:
                 thing._interact_hilight_color = thing.old_colour
+        scene.invalidate_static_layer()
 
     def toggle_images(self, ev, widget):
         self.draw_images = not self.draw_images
@@ -592,6 +594,7 @@ class AppImage(Container):
 
     def animate(self):
         if self.draw_anim:
+            self._scene.game.animation_clock.tick()
             self._scene.animate()
 
 
@@ -733,7 +736,8 @@ class RectEngine(object):
         """App loop"""
         clock = pygame.time.Clock()
         while True:
-            events = pygame.event.get()
+            # The events the game posts itself go to the event bus
+            events = pygame.event.get() + get_event_bus().drain()
             for ev in events:
                 if ev.type == QUIT:
                     return
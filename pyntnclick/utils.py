@@ -2,7 +2,12 @@
 
 from __future__ import print_function, division
 
+import os
 import sys
+import tempfile
+from collections import OrderedDict
+from contextlib import contextmanager
+from timeit import default_timer
 
 import pygame
 from pygame.color import Color
@@ -16,6 +21,9 @@ if sys.version_info.major == 2:
 else:
     str_type = str
 
+# os.rename won't replace an existing file on Windows
+_replace_file = getattr(os, 'replace', os.rename)
+
 
 def list_scenes(scene_module, scene_list):
     """List the scenes in the state"""
@@ -104,3 +112,119 @@ def make_reversible_list(seq):
        [a, b, c, d, e, d, c, b].
        This is intended as a helper for constructing looping animations."""
     return seq + seq[-2:0:-1]
+
+
+@contextmanager
+def atomic_write(fn, mode='wb'):
+    """Open a temporary file to write in place of fn.
+
+       The file is synced to disk and replaces fn once the with block
+       completes, so neither a crash nor another writer leaves fn half
+       written. If the block raises, fn is left alone."""
+    fd, tmp_fn = tempfile.mkstemp(
+        prefix=os.path.basename(fn) + '.', suffix='.tmp',
+        dir=os.path.dirname(fn) or '.')
+    try:
+        with os.fdopen(fd, mode) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        _replace_file(tmp_fn, fn)
+    except BaseException:
+        os.remove(tmp_fn)
+        raise
+
+
+class LRUCache(object):
+    """A mapping holding entries up to a total size of max_size (or any
+       size if max_size is None), discarding the least recently used
+       entries when full.
+
+       Each entry's size is size(value), or 1 if size isn't given, so
+       max_size is then the number of entries. Subclasses can keep
+       entries by overriding _can_evict, and see them go in _evicted."""
+
+    def __init__(self, max_size, size=None):
+        self.max_size = max_size
+        self._size = size
+        # map of key -> (value, size), least recently used first
+        self._entries = OrderedDict()
+        self.total_size = 0
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        try:
+            entry = self._entries.pop(key)
+        except KeyError:
+            return default
+        # Re-insert to mark as most recently used
+        self._entries[key] = entry
+        return entry[0]
+
+    def __setitem__(self, key, value):
+        self.discard(key)
+        size = self._size(value) if self._size is not None else 1
+        self._entries[key] = (value, size)
+        self.total_size += size
+        self._evict()
+
+    def discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.total_size -= entry[1]
+
+    def clear(self):
+        self._entries.clear()
+        self.total_size = 0
+
+    def _can_evict(self, key):
+        return True
+
+    def _evicted(self, key, value):
+        pass
+
+    def _evict(self):
+        if self.max_size is None or self.total_size <= self.max_size:
+            return
+        for key in list(self._entries):
+            if not self._can_evict(key):
+                continue
+            value, size = self._entries.pop(key)
+            self.total_size -= size
+            self._evicted(key, value)
+            if self.total_size <= self.max_size:
+                return
+
+
+class AnimationClock(object):
+    """The clock shared by everything animated in a game.
+
+       Each tick, frame is set to the number of frames at frame_rate
+       since the clock started, counted from the time elapsed rather
+       than the frames drawn. Animations keep their speed when frames are
+       dropped or the game runs at a lower frame rate, skipping ahead to
+       catch up."""
+
+    def __init__(self, frame_rate, clock=default_timer):
+        self.frame_rate = frame_rate
+        self._clock = clock
+        self._start = clock()
+        self.frame = 0
+
+    def tick(self):
+        self.frame = int((self._clock() - self._start) * self.frame_rate)
+
+    def time_to_next_frame(self):
+        """Return the time in seconds until the frame next changes."""
+        elapsed = self._clock() - self._start
+        return (int(elapsed * self.frame_rate) + 1) / self.frame_rate - elapsed
+
+    def time_to_frame(self, frame):
+        """Return the time in seconds until the given frame, which may be
+        negative if it's already passed."""
+        return frame / self.frame_rate - (self._clock() - self._start)
@@ -2,7 +2,7 @@ import collections
 
 import pygame
 from pygame.locals import (MOUSEBUTTONDOWN, MOUSEBUTTONUP,
-                           MOUSEMOTION, SRCALPHA, USEREVENT,
+                           MOUSEMOTION, SRCALPHA,
                            BLEND_RGBA_MIN)
 
 from ..engine import UserEvent
@@ -31,7 +31,14 @@ class Widget(object):
     def set_parent(self, parent):
         self.parent = parent
 
+    def mark_dirty(self, rect=None):
+        """Report that a region (default: our rect) needs redrawing."""
+        if self.parent is not None:
+            self.parent.mark_dirty(self.rect if rect is None else rect)
+
     def add_callback(self, eventtype, callback, *args):
+        if isinstance(eventtype, type) and issubclass(eventtype, UserEvent):
+            eventtype = eventtype.event_type()
         self.callbacks[eventtype].append((callback, args))
 
     def event(self, ev):
@@ -39,15 +46,7 @@ class Widget(object):
         if self.disabled or not self.visible:
             return False
 
-        type_ = ev.type
-        if type_ == USEREVENT:
-            for k in self.callbacks:
-                if (isinstance(k, type) and issubclass(k, UserEvent)
-                        and k.matches(ev)):
-                    type_ = k
-                    break
-
-        for callback, args in self.callbacks[type_]:
+        for callback, args in self.callbacks[ev.type]:
             if callback(ev, self, *args):
                 return True
         return False
@@ -70,18 +69,21 @@ class Widget(object):
             self.disabled = True
             self.prepare()
             self.is_prepared = True
+            self.mark_dirty()
 
     def enable(self):
         if self.disabled:
             self.disabled = False
             self.prepare()
             self.is_prepared = True
+            self.mark_dirty()
 
     def set_visible(self, visible):
         if self.visible != visible:
             self.visible = visible
             self.prepare()
             self.is_prepared = True
+            self.mark_dirty()
 
     def global_to_local(self, pos):
         x, y = pos
@@ -114,6 +116,8 @@ class Container(Widget):
     def __init__(self, pos, gd, size=None):
         super(Container, self).__init__(pos, gd, size)
         self.children = []
+        # Set to a list on the root container to collect dirty regions
+        self.dirty_rects = None
 
     def event(self, ev):
         """Push an event down through the tree, and fire our own event as a
@@ -136,15 +140,25 @@ class Container(Widget):
         if super(Container, self).event(ev):
             return True
 
+    def mark_dirty(self, rect=None):
+        if rect is None:
+            rect = self.rect
+        if self.parent is not None:
+            self.parent.mark_dirty(rect)
+        elif self.dirty_rects is not None:
+            self.dirty_rects.append(pygame.Rect(rect))
+
     def add(self, widget):
         widget.set_parent(self)
         widget.prepare()
         self.children.append(widget)
         if not self.size:
             self.rect = self.rect.union(widget.rect)
+        self.mark_dirty(widget.rect)
         return widget
 
     def remove(self, widget):
+        self.mark_dirty(widget.rect)
         widget.set_parent(None)
         self.children.remove(widget)
 
@@ -189,6 +203,15 @@ class ModalStackContainer(Container):
     def is_top(self, widget):
         return self.top is widget
 
+    def add(self, widget):
+        # Changing the stack changes what is obscured
+        self.mark_dirty()
+        return super(ModalStackContainer, self).add(widget)
+
+    def remove(self, widget):
+        self.mark_dirty()
+        super(ModalStackContainer, self).remove(widget)
+
     def draw(self, surface):
         if self.visible:
             self.do_prepare()